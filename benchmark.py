@@ -0,0 +1,214 @@
+from slot_parser import parse_slots, split_subjects
+from slot_solver import build_subject_combinations, rank_schedules, solve_schedules, has_overlap, score_schedule, filter_schedules
+from slot_cache import prepare_records
+from schedule_table import ScheduleTable
+from itertools import islice
+from pathlib import Path
+import statistics
+import argparse
+import tracemalloc
+import random
+import json
+import time
+import os
+
+html_path = Path(__file__).resolve().parent / 'test_html' / '3choose.html'
+history_path = Path(__file__).resolve().parent / 'scraped_files' / 'benchmark.jsonl'
+workers = 4
+
+# Synthetic pages: (subjects, groups per class type)
+SCALES = {
+    'small': (5, 5),
+    'medium': (8, 15),
+    'large': (10, 40),
+}
+
+def time_it(func, runs):
+    times = []
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start_time)
+    return statistics.median(times) * 1000
+
+def peak_memory(func):
+    # Run once more under tracemalloc, it slows things down so it is not timed
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+def bench_parse(page_source, my_subjects, label, runs=50):
+    quiet = lambda *_: None
+    serial = time_it(lambda: parse_slots(page_source, my_subjects, workers=1, log=quiet), runs)
+    parallel = time_it(lambda: parse_slots(page_source, my_subjects, workers=workers, log=quiet), runs)
+    rows = len(parse_slots(page_source, my_subjects, log=quiet))
+
+    print(f'{label:<14} {rows:>4} rows   serial {serial:6.1f}ms   '
+          f'{workers} workers {parallel:6.1f}ms   speedup {serial / parallel:.2f}x')
+
+# Synthetic izone page, same markup as test_html/3choose.html as far as the parser is concerned
+def make_group(code, class_type, group, teacher, day, start, end, full):
+    value = f'{code[3:]}{class_type[0]}{group:03d}'
+    radio_id = f'{code}{class_type[0]}-{value}'
+    display = 'block' if full else 'none'
+    return (
+        f'<thead class="izoneThead"><tr><td colspan="3" style="text-align:left"><div class="radio">'
+        f'<label for="{radio_id}"><input type="radio" id="{radio_id}" name="{code}{class_type[0]}" '
+        f'value="{value}" class="radio-group" data-groupNo="Group {group}" '
+        f'class-type="{class_type}" period-time-str=""><strong>Group {group}&nbsp;:&nbsp;{teacher}</strong>'
+        f'<strong><p id="clash-{radio_id}" clash-with="" style="color: #ff0000; font-size: 9pt; display: none;"></p></strong>'
+        f'<strong><p id="cap-full-{radio_id}" style="color: #ff0000; font-size: 9pt; display: {display};">(Temporarily Full)</p></strong>'
+        f'</label></div></td></tr></thead><tr class="text-center"><td>{day}</td><td>{start}:00 - {end}:00</td><td>Room</td>'
+        f'<script language="javascript">var radio_check = document.getElementById(\'{radio_id}\');'
+        f'radio_check.setAttribute(\'period-time-str\', \'{day}-{start}:00-{end}:00\');</script></tr>'
+    )
+
+def make_page(n_subjects, n_groups, seed=0):
+    rng = random.Random(seed)
+    subjects = []
+    for s in range(n_subjects):
+        code = f'SYN{1000 + s}'
+        tables = []
+        # Every subject has lectures, most have practicals, some have workshops
+        for class_type in ['Lecture', 'Practical', 'Workshop']:
+            if class_type != 'Lecture' and rng.random() < 0.3:
+                tables.append('<table class="table"></table>')
+                continue
+            groups = []
+            for g in range(1, n_groups + 1):
+                start = rng.randrange(8 * 60, 17 * 60, 30)
+                end = min(start + rng.choice([60, 120, 180]), 19 * 60)
+                groups.append(make_group(code, class_type, g, f'Teacher {rng.randrange(10)}', rng.choice(['MON', 'TUE', 'WED', 'THU', 'FRI']),
+                                         f'{start // 60:02d}:{start % 60:02d}', f'{end // 60:02d}:{end % 60:02d}', rng.random() < 0.1))
+            tables.append(f'<table class="table table-bordered table-enrollment"><thead><tr><th>DAY</th><th>TIME</th><th>ROOM</th></tr></thead>{"".join(groups)}</table>')
+        subjects.append(
+            f'<div class="mySubject" data-id="{code}"><div><span><label>{code} - Synthetic Subject {s}</label></span>'
+            f'{"".join(tables)}</div></div>\n'
+        )
+    return f'<html><body><div>{"".join(subjects)}<form name="frmAddSubject" action="?page=confirm" method="post"></form></div></body></html>'
+
+def measure(results, name, func, runs, items=None):
+    ms = time_it(func, runs)
+    peak = peak_memory(func)
+    results[name] = {'ms': round(ms, 3), 'peak_kb': round(peak, 1)}
+    if items:
+        results[name]['per_sec'] = round(items / (ms / 1000), 1)
+
+def bench_rank(results, subject_combinations, budget):
+    # The solve grows exponentially with the page, so it is cut off after budget seconds
+    # (complete False) instead of timing runs that never finish
+    def run():
+        deadline = time.perf_counter() + budget
+        rank_schedules(subject_combinations, cancelled=lambda: time.perf_counter() > deadline)
+
+    start_time = time.perf_counter()
+    run()
+    ms = (time.perf_counter() - start_time) * 1000
+    results['rank'] = {'ms': round(ms, 3), 'peak_kb': round(peak_memory(run), 1), 'complete': ms < budget * 1000}
+
+def bench_scale(scale, runs, budget):
+    n_subjects, n_groups = SCALES[scale]
+    page_source = make_page(n_subjects, n_groups)
+    quiet = lambda *_: None
+    results = {}
+
+    records = prepare_records(parse_slots(page_source, [''], log=quiet), log=quiet)
+    measure(results, 'parse', lambda: parse_slots(page_source, [''], log=quiet), runs, items=len(split_subjects(page_source)))
+    measure(results, 'combinations', lambda: build_subject_combinations(records), runs)
+    subject_combinations = build_subject_combinations(records)
+    bench_rank(results, subject_combinations, budget)
+
+    # Raw solver output, the same schedules for every per-schedule benchmark
+    solved = list(islice(solve_schedules(subject_combinations), 20000))
+    ranked = [(score_schedule(classes), tuple(cls.id for cls in classes)) for classes in solved]
+    measure(results, 'has_overlap', lambda: [has_overlap(classes) for classes in solved], runs, items=len(solved))
+    measure(results, 'score_schedule', lambda: [score_schedule(classes) for classes in solved], runs, items=len(solved))
+    measure(results, 'filter_schedules', lambda: filter_schedules(ranked, 0, 1, 0, 1, 0, 0), runs, items=len(ranked))
+
+    ids = [ids for _, ids in ranked]
+    measure(results, 'schedule_table', lambda: ScheduleTable(ids), runs, items=len(ids))
+    table = ScheduleTable(ids)
+    measure(results, 'table_filter', lambda: (table.filter_cache.clear(), table.filter(0, 1, 0, 1, 0, 0)), runs, items=len(ids))
+
+    show = bench_show_schedule(table, runs)
+    if show:
+        results['show_schedule'] = show
+
+    print(f'\n{scale}: {n_subjects} subjects, {n_groups} groups per type, {len(records)} rows, {len(solved)} schedules')
+    return results
+
+def bench_show_schedule(table, runs):
+    # Needs a display (and the GUI's imports), skipped otherwise
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as e:
+        print(f'Skipping show_schedule ({e})')
+        return None
+    try:
+        from main import TimetableGUI
+        gui = TimetableGUI(root, table)
+        steps = min(len(table) - 1, 200)
+
+        def step_through():
+            gui.index = 0
+            for _ in range(steps):
+                gui.show_next()
+            root.update_idletasks()
+
+        ms = time_it(step_through, max(1, runs // 5))
+        return {'ms': round(ms, 3), 'per_sec': round(steps / (ms / 1000), 1)}
+    finally:
+        root.destroy()
+
+def previous_run(scale):
+    if not history_path.exists():
+        return {}
+    runs = [json.loads(line) for line in history_path.read_text(encoding='utf-8').splitlines() if line]
+    runs = [run for run in runs if run['scale'] == scale]
+    return runs[-1]['results'] if runs else {}
+
+def report(results, previous):
+    # Change against the last run at the same scale, + means slower
+    print(f'{"":<18} {"median":>10} {"per sec":>12} {"peak":>10}   vs last')
+    for name, result in results.items():
+        change = ''
+        if name in previous:
+            change = f'{(result["ms"] / previous[name]["ms"] - 1) * 100:+6.1f}%'
+        per_sec = f'{result["per_sec"]:,.0f}' if 'per_sec' in result else ''
+        peak = f'{result["peak_kb"]:,.0f}KB' if 'peak_kb' in result else ''
+        if not result.get('complete', True):
+            change += ' (cut off)'
+        print(f'{name:<18} {result["ms"]:>8.2f}ms {per_sec:>12} {peak:>10}   {change}')
+
+def save_run(scale, results):
+    history_path.parent.mkdir(exist_ok=True)
+    with open(history_path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps({'time': time.time(), 'scale': scale, 'cpus': os.cpu_count(), 'results': results}) + '\n')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time the parser, solver, filters and GUI on synthetic data.')
+    parser.add_argument('--scale', nargs='+', choices=list(SCALES), default=['small', 'medium'])
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--budget', type=float, default=10, help='seconds before the full solve is cut off')
+    parser.add_argument('--no-save', action='store_true', help=f'do not add this run to {history_path.name}')
+    args = parser.parse_args()
+
+    page_source = html_path.read_text(encoding='utf-8')
+    my_subjects = [
+        'web fundamentals',
+        'operating system fundamentals',
+        'information systems analysis & design'
+    ]
+
+    print(f'Parsing {html_path.name} (median of 50 runs, {os.cpu_count()} CPUs)')
+    bench_parse(page_source, my_subjects, 'My subjects')
+    bench_parse(page_source, [''], 'All subjects')
+
+    for scale in args.scale:
+        results = bench_scale(scale, args.runs, args.budget)
+        report(results, previous_run(scale))
+        if not args.no_save:
+            save_run(scale, results)
@@ -0,0 +1,82 @@
+from dataclasses import dataclass
+from enum import IntEnum
+import sys
+
+class ClassType(IntEnum):
+    LECTURE = 0
+    PRACTICAL = 1
+    WORKSHOP = 2
+
+    @classmethod
+    def from_label(cls, label):
+        return cls[label.upper()]
+
+    @property
+    def label(self):
+        return self.name.title()
+
+    @property
+    def suffix(self):
+        return f'({self.name[0]})'
+
+@dataclass(slots=True, eq=False)
+class ClassSlot:
+    id: int
+    subject: str
+    subject_full: str
+    class_type: ClassType
+    group: str
+    teacher: str
+    day_idx: int
+    start: int
+    end: int
+    mask: int
+    radio_name: str
+    class_id: str
+    full: bool = False
+
+    def record(self):
+        # Back to the exported column names (history, CSV)
+        return {
+            'Subject': self.subject_full, 'Class Type': self.class_type.label, 'Group Number': self.group,
+            'Teacher': self.teacher, 'Radio Name': self.radio_name, 'Class ID': self.class_id, 'Full': self.full,
+        }
+
+# Every group ever compiled gets one ID for the life of the app, so a schedule
+# is just a tuple of IDs and stays valid across refreshes
+slots = []
+slot_ids = {}
+
+def slot_key(record):
+    return (record['Subject'], record['Class Type'], record['Group Number'], record['day_idx'], record['start'], record['end'])
+
+def register(record, mask):
+    key = slot_key(record)
+    slot_id = slot_ids.get(key)
+    if slot_id is None:
+        slot_id = slot_ids[key] = len(slots)
+        slots.append(ClassSlot(
+            id=slot_id,
+            subject=sys.intern(record['subject']),
+            subject_full=sys.intern(record['Subject']),
+            class_type=ClassType.from_label(record['Class Type']),
+            group=sys.intern(record['Group Number']),
+            teacher=record.get('Teacher', ''),
+            day_idx=record['day_idx'],
+            start=record['start'],
+            end=record['end'],
+            mask=mask,
+            radio_name=record.get('Radio Name') or '',
+            class_id=str(record.get('Class ID') or ''),
+        ))
+
+    # Everything outside the key can change between scrapes
+    slot = slots[slot_id]
+    slot.full = bool(record.get('Full', False))
+    slot.teacher = record.get('Teacher', slot.teacher)
+    slot.radio_name = record.get('Radio Name') or slot.radio_name
+    slot.class_id = str(record.get('Class ID') or slot.class_id)
+    return slot
+
+def get_slots(ids):
+    return [slots[i] for i in ids]
@@ -0,0 +1,125 @@
+from slot_solver import build_subject_combinations, rank_schedules, DAYS, TOP_K
+from slot_cache import load_slots, load_csv, load_cached_slots, prepare_records
+from slot_parser import parse_slots, is_my_subject
+from schedule_table import ScheduleTable
+from scoring import Scorer, load_spec
+from class_slot import get_slots
+from pathlib import Path
+import argparse
+import json
+import time
+import csv
+import sys
+
+# Rank schedules without Tk or Chrome, e.g. from cron before enrollment opens:
+#   python cli.py --html page.html --subjects "web fundamentals" --days-off 1 --top 20 > top.json
+
+CSV_COLUMNS = ['Rank', 'Score', 'Subject', 'Class Type', 'Group Number', 'Teacher', 'Day',
+               'Start Time', 'End Time', 'Radio Name', 'Class ID']
+
+def log(msg):
+    # stdout is kept for the results
+    print(msg, file=sys.stderr)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Rank clash-free schedules from scraped slots.')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--slots', help='slots.npz or slots.csv (default: the last scrape in scraped_files)')
+    source.add_argument('--html', help='a saved izone choose page')
+    # Every subject on a choose page never fits in one timetable, so they have to be picked
+    parser.add_argument('--subjects', nargs='+', required=True, help='parts of subject names, e.g. "web fundamentals"')
+
+    parser.add_argument('--days-off', type=int, choices=[1, 2, 3], help='exactly this many weekdays off')
+    parser.add_argument('--no-long-gaps', action='store_true', help='no gaps of 4h or more')
+    parser.add_argument('--max-long-gap-days', action='store_true', help='at most one day with a 4h gap')
+    parser.add_argument('--no-single-days', action='store_true', help='no days with only one class')
+    parser.add_argument('--scoring', help='TOML/JSON scoring spec (see scoring.example.toml)')
+
+    parser.add_argument('--top', type=int, default=20, help='schedules to output')
+    parser.add_argument('--candidates', type=int, default=TOP_K, help='schedules ranked before filtering')
+    parser.add_argument('--format', choices=['json', 'csv'], default='json')
+    parser.add_argument('--output', help='file to write (default: stdout)')
+    return parser.parse_args(argv)
+
+def load_records(args):
+    if args.html:
+        page_source = Path(args.html).read_text(encoding='utf-8')
+        return prepare_records(parse_slots(page_source, [s.lower() for s in args.subjects], log=log), log=log)
+
+    if args.slots:
+        records = load_slots(args.slots) if args.slots.endswith('.npz') else load_csv(args.slots, log=log)
+    else:
+        records = load_cached_slots(log=log)
+    return [cls for cls in records if is_my_subject(cls['Subject'], [s.lower() for s in args.subjects])]
+
+def rank(records, args, scorer=None):
+    subject_combinations = build_subject_combinations(records)
+    ranked = rank_schedules(subject_combinations, max(args.candidates, args.top))
+    table = ScheduleTable([ids for _, ids in ranked], scorer)
+
+    filtered = table.filter(
+        args.days_off == 1, args.days_off == 2, args.days_off == 3,
+        args.no_long_gaps, args.max_long_gap_days, args.no_single_days
+    )
+    log(f'{len(ranked)} candidates, {len(filtered)} after filters')
+    return filtered[:args.top]
+
+def to_time(minutes):
+    return f'{minutes // 60:02d}:{minutes % 60:02d}'
+
+def schedule_classes(ids):
+    return [
+        {
+            'Subject': cls.subject_full, 'Class Type': cls.class_type.label, 'Group Number': cls.group,
+            'Teacher': cls.teacher, 'Day': DAYS[cls.day_idx], 'Start Time': to_time(cls.start),
+            'End Time': to_time(cls.end), 'Radio Name': cls.radio_name, 'Class ID': cls.class_id,
+        }
+        for cls in sorted(get_slots(ids), key=lambda c: (c.subject, c.class_type))
+    ]
+
+def write_json(schedules, f):
+    result = [{'rank': rank, 'score': score, 'classes': schedule_classes(ids)}
+              for rank, (score, ids) in enumerate(schedules, 1)]
+    json.dump(result, f, indent=2)
+    f.write('\n')
+
+def write_csv(schedules, f):
+    writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+    # One row per class, the rank and score repeated on each
+    for rank, (score, ids) in enumerate(schedules, 1):
+        writer.writerows({'Rank': rank, 'Score': score, **row} for row in schedule_classes(ids))
+
+def main(argv=None):
+    args = parse_args(argv)
+    start_time = time.perf_counter()
+
+    try:
+        records = load_records(args)
+        scorer = Scorer(load_spec(args.scoring)) if args.scoring else None
+    except (OSError, ValueError) as e:
+        # A missing file or a bad scoring spec, no traceback for cron to mail
+        log(f'[ERROR] {e}')
+        return 1
+    if not records:
+        log('No slots found, scrape first or pass --slots/--html')
+        return 1
+    schedules = rank(records, args, scorer)
+    if not schedules:
+        # Non-zero so a cron job does not take an empty ranking for success
+        log('No schedule fits, check --subjects and the filters')
+        return 1
+
+    write = write_json if args.format == 'json' else write_csv
+    if args.output:
+        with open(args.output, 'w', newline='', encoding='utf-8') as f:
+            write(schedules, f)
+        log(f'{len(schedules)} schedules written to "{args.output}"')
+    else:
+        write(schedules, sys.stdout)
+
+    log(f'Total time: {time.perf_counter() - start_time:.2f}s')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,55 @@
+from tracing import span
+from pathlib import Path
+import threading
+
+# webdriver_manager checks online for the latest chromedriver on every install(),
+# so remember the path it gave us last time
+cache_path = Path(__file__).resolve().parent / 'scraped_files' / 'chromedriver_path.txt'
+
+driver = None
+driver_lock = threading.Lock()
+
+def get_chromedriver_path(refresh=False):
+    if not refresh and cache_path.exists():
+        path = cache_path.read_text().strip()
+        if Path(path).exists():
+            return path
+
+    from webdriver_manager.chrome import ChromeDriverManager
+    path = ChromeDriverManager().install()
+    cache_path.write_text(path)
+    return path
+
+def init_driver(headless, eager=False, log=print):
+    log('Setting up webdriver...')
+
+    # Selenium is only imported once Chrome is actually needed
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.chrome.options import Options
+    from selenium import webdriver
+
+    options = Options()
+    if headless:
+        options.add_argument('--headless=new')
+    if eager:
+        options.page_load_strategy = 'eager'
+
+    with span('driver start', headless=headless):
+        try:
+            service = Service(get_chromedriver_path())
+            return webdriver.Chrome(service=service, options=options)
+        except Exception:
+            # Cached chromedriver no longer matches Chrome, resolve it again
+            service = Service(get_chromedriver_path(refresh=True))
+            return webdriver.Chrome(service=service, options=options)
+
+def get_driver(headless, log=print):
+    # Shared driver, created on first use
+    global driver
+    with driver_lock:
+        if driver is None:
+            driver = init_driver(headless, eager=True, log=log)
+    return driver
+
+def prewarm_driver(headless):
+    threading.Thread(target=get_driver, args=(headless,), daemon=True).start()
@@ -0,0 +1,318 @@
+from slot_parser import parse_slots, is_full
+from slot_cache import prepare_records, save_slots
+from slot_history import record_snapshot
+from tracing import trace, span
+from worker import Cancelled
+from urllib.parse import urljoin
+from pathlib import Path
+from lxml import html
+import requests
+import keyring
+import json
+import time
+import re
+
+BASE_URL = 'https://izone.sunway.edu.my'
+
+# Cookies and dashboard URL of the last login, only written when persist=True
+session_path = Path(__file__).resolve().parent / 'scraped_files' / 'session.json'
+
+# Only shown once a selection has gone through
+PREVIEW_FORM = '//form[@name="frmSubjectPreview"]'
+
+# Seconds to wait for izone on every request, a server that hangs during the rush
+# fails the request (and falls back to Chrome) instead of blocking the worker
+TIMEOUT = 30
+
+class IzoneClient:
+    def __init__(self, base_url=BASE_URL, log=print):
+        self.log = log
+        # One pooled keep-alive session for every request
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = 'Mozilla/5.0'
+        self.base_url = base_url
+        self.choose_url = None
+        self.page_source = None
+        # Checked while waiting for the Enroll button, set per task by get_session
+        self.cancelled = None
+
+    def open(self, username, password, persist=False):
+        # Reuse the choose page while the session is alive, log in only when it has expired
+        self.credentials = (username, password, persist)
+        if self.choose_url:
+            with span('reload'):
+                response = self.session.get(self.choose_url, timeout=TIMEOUT)
+            if not is_login_page(response.text):
+                self.log('Reusing session...')
+                self.load_choose_page(response)
+                return
+            self.log('Session expired, logging in again...')
+
+        # Saved cookies go straight to the dashboard if they are still valid
+        saved = load_session() if persist else None
+        if saved:
+            for cookie in saved['cookies']:
+                self.session.cookies.set(cookie['name'], cookie['value'], domain=cookie.get('domain', ''), path=cookie.get('path', '/'))
+            home = self.session.get(saved['home_url'], timeout=TIMEOUT)
+            if is_login_page(home.text):
+                home = self.login(username, password)
+        else:
+            home = self.login(username, password)
+
+        if persist:
+            save_session(home.url, [
+                {'name': c.name, 'value': c.value, 'domain': c.domain, 'path': c.path} for c in self.session.cookies
+            ])
+        self.enroll(home)
+
+    def login(self, username, password):
+        self.log('Logging in...')
+
+        with span('login'):
+            response = self.session.get(f'{self.base_url}/login', timeout=TIMEOUT)
+            tree = html.fromstring(response.text)
+            form = tree.get_element_by_id('login_form')
+
+            fields = form_fields(form)
+            fields['student_uid'] = username
+            fields['password'] = password
+            home = self.submit(response.url, form, fields)
+
+        # Wrong or missing credentials only bring the login page back
+        if is_login_page(home.text):
+            raise AssertionError('Login failed, check the username and password saved with store_pw.py')
+        return home
+
+    def enroll(self, home):
+        self.log('Enrolling...')
+
+        with span('enroll') as record:
+            while True:
+                tree = html.fromstring(home.text)
+
+                # Enroll btn triggers a hidden form: $('#submit_...').trigger('click')
+                links = tree.xpath('//div[@id="panel-dashboard-profile"]//a[@class="btn btn-default"]')
+                match = re.search(r"#(submit_[^']+)'", links[0].get('onclick', '')) if links else None
+                if match:
+                    break
+
+                # Keep waiting for enrollment to open until cancelled
+                if self.cancelled and self.cancelled():
+                    raise Cancelled('Cancelled')
+
+                # Reload
+                self.log('Button not found. Refreshing...')
+                record['retries'] = record.get('retries', 0) + 1
+                reload_links = tree.xpath('//a[@id="reloadUrl"]')
+                if reload_links:
+                    self.session.get(urljoin(home.url, reload_links[0].get('href')), timeout=TIMEOUT)
+                time.sleep(1)
+                home = self.session.get(home.url, timeout=TIMEOUT)
+
+            form = next(tree.get_element_by_id(match.group(1)).iterancestors('form'))
+            response = self.submit(home.url, form, form_fields(form))
+        self.load_choose_page(response)
+
+    def load_choose_page(self, response):
+        tree = html.fromstring(response.text)
+
+        # If chosen, press Edit to get back to the choose page
+        if not tree.find_class('mySubject'):
+            forms = tree.xpath(PREVIEW_FORM)
+            if forms:
+                with span('edit'):
+                    fields = form_fields(forms[0])
+                    fields['btn_edit'] = ''
+                    response = self.submit(response.url, forms[0], fields)
+
+        self.choose_url = response.url
+        self.page_source = response.text
+
+    def refresh(self):
+        self.page_source = self.session.get(self.choose_url, timeout=TIMEOUT).text
+        if is_login_page(self.page_source):
+            self.open(*self.credentials)
+
+    def scrape(self, my_subjects, include_full=False):
+        with span('parse'):
+            return parse_slots(self.page_source, my_subjects, include_full=include_full, log=self.log)
+
+    def group_status(self):
+        # (radio name, class ID) -> (group number, full) for every group on the page
+        tree = html.fromstring(self.page_source)
+        groups = {}
+        for thead in tree.xpath('//form[@name="frmAddSubject"]//thead[@class="izoneThead"]'):
+            for radio in thead.xpath('.//input[@type="radio"]'):
+                groups[(radio.get('name'), radio.get('value'))] = (radio.get('data-groupno'), is_full(thead))
+        return groups
+
+    def submit_selection(self, choices):
+        error = check_choices(self.group_status(), choices)
+        if error:
+            raise AssertionError(error)
+        response = self.post_selection(choices)
+        if response is None:
+            raise AssertionError('Not confirmed, the choose page came back')
+        return response
+
+    def select_schedules(self, ranked):
+        # Take the best schedule whose groups are all open, checked against
+        # the page we already have so no reload is needed between tries
+        with span('check groups'):
+            groups = self.group_status()
+        for i, choices in enumerate(ranked):
+            error = check_choices(groups, choices)
+            if error:
+                self.log(f'Schedule {i + 1}: {error}')
+                continue
+
+            if self.post_selection(choices):
+                return i
+
+            # Back on the choose page, try the rest against the groups it shows now
+            self.log(f'Schedule {i + 1}: not confirmed, the choose page came back')
+            groups = self.group_status()
+        raise AssertionError(f'None of the {len(ranked)} schedules could be selected')
+
+    def post_selection(self, choices):
+        # Post the enrollment form directly with the chosen radios
+        self.log(f'Submitting {len(choices)} groups...')
+        with span('submit', groups=len(choices)):
+            tree = html.fromstring(self.page_source)
+            form = tree.xpath('//form[@name="frmAddSubject"]')[0]
+
+            fields = form_fields(form)
+            fields.update(choices)
+            fields['inp_confirm'] = '1'
+            fields['btn_submit'] = ''
+            try:
+                response = self.submit(self.choose_url, form, fields)
+            except requests.Timeout:
+                # May still have been taken, so neither the next schedule nor Chrome is tried
+                raise AssertionError(f'Submission unconfirmed after {TIMEOUT}s, check the choose page before selecting again')
+
+        # Only the preview page means the selection went through
+        response.raise_for_status()
+        tree = html.fromstring(response.text)
+        if tree.xpath(PREVIEW_FORM):
+            return response
+        if not tree.find_class('mySubject'):
+            raise AssertionError(f'Not confirmed, unexpected page after submitting ({response.url})')
+
+        # A group filled up in between, the returned choose page has the new state
+        self.page_source = response.text
+        return None
+
+    def submit(self, page_url, form, fields):
+        url = urljoin(page_url, form.get('action') or '')
+        return self.session.post(url, data=fields, timeout=TIMEOUT)
+
+# Helper Functions
+def form_fields(form):
+    # Values a browser would send by default (hidden/text inputs and checked radios)
+    fields = {}
+    for field in form.xpath('.//input[@name]'):
+        input_type = field.get('type', 'text').lower()
+        if input_type in ('submit', 'button', 'reset', 'checkbox'):
+            continue
+        if input_type == 'radio' and field.get('checked') is None:
+            continue
+        fields[field.get('name')] = field.get('value', '')
+    return fields
+
+def check_choices(groups, choices):
+    for name, value in choices.items():
+        if (name, value) not in groups:
+            return f'Group not found: {name} {value}'
+        group_no, full = groups[(name, value)]
+        if full:
+            return f'Group full: {group_no} ({name})'
+    return None
+
+def load_session():
+    try:
+        return json.loads(session_path.read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+
+def save_session(home_url, cookies):
+    session_path.write_text(json.dumps({'home_url': home_url, 'cookies': cookies}))
+
+def is_login_page(page_source):
+    return 'id="login_form"' in page_source
+
+def get_client(testing, log=print):
+    if testing:
+        # Serve test_html/ from a local stand-in for izone
+        from stub_server import start_stub_server
+        return IzoneClient(base_url=start_stub_server(), log=log), 'test', 'test'
+
+    username = keyring.get_password('izone', 'username')
+    password = keyring.get_password('izone', 'password')
+    if not username or not password:
+        raise AssertionError('No izone login saved, set it with store_pw.py')
+    return IzoneClient(log=log), username, password
+
+shared = {}
+
+def get_session(testing, persist=False, cancelled=None, log=print):
+    # One logged in client shared by scraping, selecting and watching
+    if testing not in shared:
+        shared[testing] = get_client(testing, log=log)
+
+    client, username, password = shared[testing]
+    client.log = log
+    client.cancelled = cancelled
+    # Nothing to keep between launches with the stub server
+    client.open(username, password, persist=persist and not testing)
+    return client
+
+def start_http_scrape(testing, my_subjects, persist=False, export_csv=False, history=False, cancelled=None, log=print):
+    # Start timing
+    log('\n=====================[ SCRAPING ]=====================')
+    start_time = time.time()
+
+    with trace('scrape', log=log):
+        client = get_session(testing, persist=persist, cancelled=cancelled, log=log)
+        # Full groups are only kept for the history
+        rows = client.scrape(my_subjects, include_full=True)
+        with span('export'):
+            if history:
+                record_snapshot(rows, log=log)
+            data = prepare_records([cls for cls in rows if not cls['Full']], log=log)
+            save_slots(data, export_csv=export_csv, log=log)
+
+    # End timing
+    end_time = time.time()
+    log(f'\nTotal scraping time: {end_time - start_time:.2f}s')
+    log('======================================================\n')
+    return data
+
+def start_http_select(testing, ranked, persist=False, cancelled=None, log=print):
+    # Start timing
+    log('\n=====================[ SELECTING ]=====================')
+    start_time = time.time()
+
+    with trace('select', log=log):
+        client = get_session(testing, persist=persist, cancelled=cancelled, log=log)
+        try:
+            index = client.select_schedules(ranked)
+        except AssertionError:
+            # Nothing to fall back to, this login only lives inside the program
+            log(f'Select the rest manually: log in at {BASE_URL} in your own browser')
+            raise
+    log(f'Selected schedule {index + 1}')
+
+    # End timing
+    end_time = time.time()
+    log(f'\nTotal select time: {end_time - start_time:.2f}s')
+    log('======================================================\n')
+    return index
+
+if __name__ == '__main__':
+    my_subjects = [
+        'web fundamentals',
+        'operating system fundamentals',
+        'information systems analysis & design'
+    ]
+    start_http_scrape(testing=True, my_subjects=my_subjects)
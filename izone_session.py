@@ -0,0 +1,125 @@
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.common.by import By
+from izone_client import BASE_URL, load_session, save_session
+from waits import make_wait
+from tracing import span
+from pathlib import Path
+import keyring
+
+class IzoneSession:
+    # Keeps the Chrome tab logged in and on the choose page so the scraper
+    # and selector only log in and enroll when the session has expired
+    def __init__(self, driver, testing, persist=False, log=print):
+        self.driver = driver
+        self.testing = testing
+        self.persist = persist
+        self.log = log
+        self.wait = make_wait(self.driver)
+        self.choose_url = None
+
+    def open_choose_page(self):
+        if self.choose_url:
+            with span('reload'):
+                self.driver.get(self.choose_url)
+            if self.on_choose_page() or self.on_chosen_page():
+                self.log('Reusing session...')
+                self.check_tnc()
+                return
+            self.log('Session expired, logging in again...')
+
+        self.get_page()
+        if not self.testing:
+            if self.on_login_page():
+                self.login()
+            self.enroll()
+
+        # If testing, directly navigate to page
+        self.check_tnc()
+        self.choose_url = self.driver.current_url
+
+    def get_page(self):
+        self.log('Fetching page...')
+
+        with span('page load'):
+            if self.testing:
+                self.log('')
+                self.driver.get(Path('test_html/3choose.html').resolve().as_uri())
+                return
+
+            # Saved cookies go straight to the dashboard if they are still valid
+            saved = load_session() if self.persist else None
+            self.driver.get(f'{BASE_URL}/login')
+            if saved:
+                for cookie in saved['cookies']:
+                    self.driver.add_cookie({key: cookie[key] for key in ('name', 'value', 'domain', 'path') if key in cookie})
+                self.driver.get(saved['home_url'])
+
+    def login(self):
+        self.log('Logging in...')
+
+        with span('login'):
+            input_un = self.wait.until(EC.presence_of_element_located((By.ID, 'student_uid')))
+            input_pw = self.wait.until(EC.presence_of_element_located((By.ID, 'password')))
+            submit_btn = self.wait.until(EC.presence_of_element_located((By.ID, 'submit')))
+
+            input_un.send_keys(keyring.get_password('izone', 'username'))
+            input_pw.send_keys(keyring.get_password('izone', 'password'))
+            submit_btn.click()
+
+    def enroll(self):
+        self.log('Enrolling...')
+
+        with span('enroll') as record:
+            while True:
+                try:
+                    # Enroll btn
+                    enroll_btn = self.wait.until(
+                        EC.element_to_be_clickable((By.XPATH, '//div[@id="panel-dashboard-profile"]//a[@class="btn btn-default"]'))
+                    )
+                    break
+
+                except TimeoutException:
+                    # Reload
+                    self.wait.until(
+                        EC.element_to_be_clickable((By.ID, 'reloadUrl'))
+                    ).click()
+                    self.log('Button not found. Refreshing...')
+                    record['retries'] = record.get('retries', 0) + 1
+
+            if self.persist:
+                save_session(self.driver.current_url, self.driver.get_cookies())
+            enroll_btn.click()
+
+    def check_tnc(self):
+        with span('tnc'):
+            try:
+                self.wait.until(
+                    EC.element_to_be_clickable((By.ID, 'chk_confirm'))
+                ).click()
+            except TimeoutException:  # If chosen
+                self.driver.find_element(By.XPATH, '//button[@name="btn_edit"]').click()
+                self.wait.until(
+                    EC.element_to_be_clickable((By.ID, 'chk_confirm'))
+                ).click()
+
+    # Helper Functions
+    def on_login_page(self):
+        return bool(self.driver.find_elements(By.ID, 'student_uid'))
+
+    def on_choose_page(self):
+        return bool(self.driver.find_elements(By.CLASS_NAME, 'mySubject'))
+
+    def on_chosen_page(self):
+        return bool(self.driver.find_elements(By.XPATH, '//button[@name="btn_edit"]'))
+
+session = None
+
+def get_session(driver, testing, persist=False, log=print):
+    # One session per driver, shared by the scraper and the selector
+    global session
+    if session is None or session.driver is not driver or session.testing != testing:
+        session = IzoneSession(driver, testing, persist=persist, log=log)
+    session.persist = persist
+    session.log = log
+    return session
@@ -1,12 +1,15 @@
+from slot_solver import build_subject_combinations, rank_schedules, rerank_schedules
+from driver_setup import get_driver, prewarm_driver
+from schedule_table import ScheduleTable
+from schedule_list import ScheduleList
+from scoring import Scorer, load_spec
+from slot_cache import load_cached_slots
+from class_slot import ClassType, get_slots
+from worker import Worker, Cancelled
+from tracing import trace
 from collections import defaultdict
-from itertools import product
-import tkinter as tk
-import pandas as pd
 from pathlib import Path
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium import webdriver
+import tkinter as tk
 
 # Can Modify
 # --------------------------------------------------------
@@ -16,185 +19,108 @@ my_subjects = [
     'information systems analysis & design'
 ]
 testing = True
+parse_html = True  # Parse the page in one go instead of reading every element through Chrome
+browserless = True  # Scrape and select over plain HTTP, Chrome is only used if that fails
+direct_select = True  # Submit the whole schedule at once instead of clicking every radio
+top_k = 300  # Schedules loaded per batch (Next on the last one loads more)
+prewarm = False  # Start Chrome in the background at launch instead of on first use
+watch_interval = 1.0  # Seconds between polls in Watch Slots
+fallback_limit = 50  # Next best schedules tried when a group is full at selection
+export_csv = False  # Also write scraped_files/slots.csv after each scrape
+keep_history = True  # Log every scrape (full groups included) to scraped_files/history.sqlite
+keep_session = False  # Save the login cookies to scraped_files/session.json so the next launch skips logging in
+scoring_file = None  # e.g. 'scoring.toml' (see scoring.example.toml) to rank by your own weights and limits
 # --------------------------------------------------------
 
 
-# Set up driver
+# Chrome is started on first Refresh/Select (or in the background if prewarm)
 headless = False
-def init_driver(headless):
-    print('Setting up webdriver...')
-
-    options = Options()
-    if headless:
-        options.add_argument('--headless=new')
-    options.page_load_strategy = 'eager'
-
-    # Use Service with WebDriver Manager
-    service = Service(ChromeDriverManager().install())
-    return webdriver.Chrome(service=service, options=options)
-driver = init_driver(headless=headless)
-
-# Get the directory where choose_timetable.py is located
-script_dir = Path(__file__).resolve().parent
-
-# Modify the CSV loading section to use the correct path
-try:
-    csv_path = script_dir / "scraped_files" / "slots.csv"
-    df = pd.read_csv(csv_path)
-    df["subject"] = df["Subject"].apply(lambda x: x.split(" - ")[1])
-    df["Time"] = df["Start Time"].str.strip() + " - " + df["End Time"].str.strip()
-except FileNotFoundError:
-    # Create empty DataFrame with required columns if file doesn't exist
-    df = pd.DataFrame(columns=["Subject", "Class Type", "Group Number", "Teacher", "Day", "Time"])
-    df["subject"] = ""
-
-# Split lectures, practicals, and workshops
-lectures = df[df["Class Type"] == "Lecture"]
-practicals = df[df["Class Type"] == "Practical"]
-workshops = df[df["Class Type"] == "Workshop"]
-
-lecture_groups = lectures.groupby("subject")
-practical_groups = practicals.groupby("subject")
-workshop_groups = workshops.groupby("subject")
-
-# Create subject-wise triplets (lecture, practical, workshop)
-subject_combinations = {}
-for subject in lectures["subject"].unique():
-    lec = lecture_groups.get_group(subject).to_dict("records") if subject in lecture_groups.groups else [{}]
-    prac = practical_groups.get_group(subject).to_dict("records") if subject in practical_groups.groups else [{}]
-    work = workshop_groups.get_group(subject).to_dict("records") if subject in workshop_groups.groups else [{}]
-    subject_combinations[subject] = list(product(lec, prac, work))
+if prewarm:
+    prewarm_driver(headless=headless)
+
+# Last scrape, kept in scraped_files/slots.npz with the days and times already parsed
+slot_records = load_cached_slots()
+
+subject_combinations = build_subject_combinations(slot_records)
 
 # Assign fixed colors to subjects
 subject_colors = {}
 fixed_colors = ["#990012", "#6A0DAD", "#0020C2", "#3A5F0B", "#873600"]
 #                  Red,      Purple,     Blue,     Green 
 
-for i, subject in enumerate(df["subject"].unique()):
+for i, subject in enumerate(dict.fromkeys(cls["subject"] for cls in slot_records)):
     subject_colors[subject] = fixed_colors[i % len(fixed_colors)]
 
 # Helper functions
-def time_to_tuple(cls):
-    h1, m1 = map(int, cls["Start Time"].split(":"))
-    h2, m2 = map(int, cls["End Time"].split(":"))
-    return h1 * 60 + m1, h2 * 60 + m2
-
-def has_overlap(classes):
-    schedule = defaultdict(list)
-    for cls in classes:
-        if not cls: continue
-        day = cls["Day"]
-        start, end = time_to_tuple(cls)
-        for s, e in schedule[day]:
-            if start < e and end > s:
-                return True
-        schedule[day].append((start, end))
-    return False
-
-def score_schedule(classes):
-    daily = defaultdict(list)
-    for cls in classes:
-        if not cls: continue
-        daily[cls["Day"]].append(time_to_tuple(cls))
-
-    total_gap = 0
-    single_days = 0
-    school_days = 0
-    long_gap_penalty = 0
-
-    for times in daily.values():
-        times.sort()
-        if len(times) == 1:
-            single_days += 1
-        school_days += 1
-        gaps = [times[i+1][0] - times[i][1] for i in range(len(times)-1)]
-        total_gap += sum(gaps)
-        long_gap_penalty += sum(1 for g in gaps if g >= 240) * 100
-
-    days_off_bonus = (5 - school_days) * 20
-    return total_gap + (40 * single_days) + long_gap_penalty - days_off_bonus
-
-def filter_schedules(schedules, f1, f2, f3, f4, f5, f6):
-    def count_school_days(classes):
-        return len(set(cls["Day"] for cls in classes if cls))
-
-    def has_large_gap(classes):
-        daily = defaultdict(list)
-        for cls in classes:
-            if not cls: continue
-            daily[cls["Day"]].append(time_to_tuple(cls))
-        for times in daily.values():
-            times.sort()
-            for i in range(len(times) - 1):
-                if times[i+1][0] - times[i][1] >= 240:
-                    return True
-        return False
-
-    def count_large_gap_days(classes):
-        daily = defaultdict(list)
-        for cls in classes:
-            if not cls: continue
-            daily[cls["Day"]].append(time_to_tuple(cls))
-        count = 0
-        for times in daily.values():
-            times.sort()
-            for i in range(len(times) - 1):
-                if times[i+1][0] - times[i][1] >= 240:
-                    count += 1
-                    break
-        return count
-
-    def has_single_class_day(classes):
-        daily = defaultdict(list)
-        for cls in classes:
-            if not cls: continue
-            daily[cls["Day"]].append(cls)
-        return any(len(day) == 1 for day in daily.values())
-
-    filtered = []
-    for score, combo in schedules:
-        days = count_school_days(combo)
-        if f1 and days != 4:
-            continue
-        if f2 and days != 3:
-            continue
-        if f3 and days != 2:
-            continue
-        if f4 and has_large_gap(combo):
-            continue
-        if f5 and count_large_gap_days(combo) > 1:
-            continue
-        if f6 and has_single_class_day(combo):
-            continue
-        filtered.append((score, combo))
-    return filtered
-
 def get_earliest_time(combos):
     earliest = float('inf')
     for _, combo in combos:
-        for cls in combo:
-            if not cls: continue
-            start, _ = time_to_tuple(cls)
-            earliest = min(earliest, start)
+        for cls in get_slots(combo):
+            earliest = min(earliest, cls.start)
     return earliest
 
 def build_dynamic_slots(valid_schedules, earliest_start):
+    # Nothing ranked yet (or nothing fits), no grid
+    if not valid_schedules:
+        return []
+
     # Find latest ending time across all schedules
     latest_end = 0
     for _, combo in valid_schedules:
-        for cls in combo:
-            if not cls:
-                continue
-            _, end = time_to_tuple(cls)
-            latest_end = max(latest_end, end)
+        for cls in get_slots(combo):
+            latest_end = max(latest_end, cls.end)
 
     # Build full range of 30-min slots
     return list(range(earliest_start, latest_end + 30, 30))
 
+def load_scorer():
+    # Compiled once, then reused for every table until Reload Scoring
+    if not scoring_file:
+        return None
+    return Scorer(load_spec(Path(__file__).resolve().parent / scoring_file))
+
+scorer = load_scorer()
+
+def generate_schedules(subject_combinations, k=top_k, cancelled=None):
+    # Backtracking solver only yields clash-free schedules and
+    # skips subtrees that cannot beat the current k-th best
+    ranked = rank_schedules(subject_combinations, k, cancelled=cancelled)
+    return ScheduleTable([ids for _, ids in ranked], scorer)
+
+
+def get_selection(combo):
+    # What the selector needs for one schedule
+    combo = get_slots(combo)
+    subjects, l_groups, p_groups, w_groups = [], [], [], []
+
+    subject_set = set(cls.subject for cls in combo)
+    for subject in subject_set:
+        l_group = p_group = w_group = ''
+        for cls in combo:
+            if cls.subject != subject:
+                continue
+            if cls.class_type == ClassType.LECTURE:
+                l_group = cls.group
+            elif cls.class_type == ClassType.PRACTICAL:
+                p_group = cls.group
+            elif cls.class_type == ClassType.WORKSHOP:
+                w_group = cls.group
+        subjects.append(subject.lower())
+        l_groups.append(f' {l_group.split(' ')[-1]} ')
+        p_groups.append(f' {p_group.split(' ')[-1]} ')
+        w_groups.append(f' {w_group.split(' ')[-1]} ')
+
+    # Radio name -> class ID for direct submission (older scrapes don't have them)
+    choices = {}
+    if direct_select and all(cls.radio_name for cls in combo):
+        choices = {cls.radio_name: cls.class_id for cls in combo}
+
+    return {"choices": choices, "subjects": subjects, "l_groups": l_groups, "p_groups": p_groups, "w_groups": w_groups}
+
 
 # GUI
 class TimetableGUI:
-    def __init__(self, master, combos):
+    def __init__(self, master, table):
         self.master = master
         master.title("Class Schedule Viewer")
         master.configure(bg="black")
@@ -246,6 +172,18 @@ class TimetableGUI:
                                           width=12, font=("Helvetica", 18))
         self.select_slot_button.pack(side=tk.RIGHT, padx=10)
 
+        self.watch_button = tk.Button(self.nav_frame, text="Watch Slots", command=self.watch_slots,
+                                      width=12, font=("Helvetica", 18))
+        self.watch_button.pack(side=tk.RIGHT, padx=10)
+
+        self.list_button = tk.Button(self.nav_frame, text="List", command=self.show_list,
+                                     width=12, font=("Helvetica", 18))
+        self.list_button.pack(side=tk.RIGHT, padx=10)
+
+        self.scoring_button = tk.Button(self.nav_frame, text="Reload Scoring", command=self.reload_scoring,
+                                        width=12, font=("Helvetica", 18))
+        self.scoring_button.pack(side=tk.RIGHT, padx=10)
+
         self.summary_container = tk.Frame(self.main_frame, bg="white", bd=2, relief=tk.SOLID)
         self.summary_container.pack(pady=(0, 0), fill=tk.BOTH, expand=True)
 
@@ -264,75 +202,147 @@ class TimetableGUI:
         self.summary_canvas.bind("<Configure>", lambda e: self.summary_canvas.itemconfig(self.summary_window, width=e.width))
         # === End scrollable section ===
 
-        self.all_combos = combos
-        self.filtered_combos = combos
-        self.index = 0
-        earliest_start = get_earliest_time(valid_schedules)
-        self.time_slots = build_dynamic_slots(combos, earliest_start)
-        self.earliest_start = earliest_start
         self.days = ["MON", "TUE", "WED", "THU", "FRI"]
+        self.slot_width = 60
+        self.row_height = 60
+        self.day_col_width = 80
+        self.grid_layout = None
+        self.blocks = []
+        self.summary_shape = None
+        self.summary_labels = []
+
+        # Holding an arrow key steps through schedules
+        master.bind("<Left>", lambda e: self.show_prev())
+        master.bind("<Right>", lambda e: self.show_next())
+        master.bind("<Prior>", lambda e: self.show_index(self.index - 10))
+        master.bind("<Next>", lambda e: self.show_index(self.index + 10))
+
+        self.list_pane = None
+
+        self.worker = Worker(master)
+        self.limit = top_k
+        self.index = 0
+        self.set_table(table, complete=False)
         self.show_schedule()
 
+    def set_table(self, table, complete=True):
+        # complete: the table is the full top-K of a ranking that was not cancelled,
+        # only then can a refresh re-rank from it instead of solving again
+        self.table = table
+        self.complete = complete
+        self.has_more = len(table) >= self.limit
+        self.all_combos = table.schedules
+        self.filtered_combos = table.filter(
+            self.var_f1.get(), self.var_f2.get(), self.var_f3.get(),
+            self.var_f4.get(), self.var_f5.get(), self.var_f6.get()
+        )
+        self.earliest_start = get_earliest_time(self.all_combos)
+        self.time_slots = build_dynamic_slots(self.all_combos, self.earliest_start)
+
+    def load_more(self, minimum=0, then=None):
+        # Rank the next batch on demand, on the worker like the first one
+        self.rank_slots(max(self.limit + top_k, minimum), then)
+
     def run_select_slot(self):
         if not self.filtered_combos:
             return
 
-        popup, label = self.show_popup("Selecting slots...")
+        # The shown schedule first, then the next best ones to fall back on if a group is full
+        view = self.filtered_combos
+        start = self.index
+        combos = view[start:start + fallback_limit]
+        schedules = [get_selection(combo) for _, combo in combos]
+
+        def task(worker):
+            worker.check_cancelled()
+            # Driver start, login and every click end up in one trace
+            with trace("select", log=worker.log):
+                return self.select(schedules, cancelled=worker.cancelled, log=worker.log)
+
+        def on_done(index):
+            # Show the schedule that went through, found again if the filters changed meanwhile
+            if self.filtered_combos is view:
+                index = start + index
+            else:
+                ids = combos[index][1]
+                index = next((i for i in range(len(self.filtered_combos)) if self.filtered_combos[i][1] == ids), None)
+            if index is not None and index != self.index:
+                self.index = index
+                self.show_schedule()
+
+        self.run_task("Selecting slots...", task, on_done)
+
+    def select(self, schedules, cancelled=None, log=print):
+        if browserless and all(schedule["choices"] for schedule in schedules):
+            try:
+                from izone_client import start_http_select
+                return start_http_select(testing=testing, ranked=[schedule["choices"] for schedule in schedules],
+                                         persist=keep_session, cancelled=cancelled, log=log)
+            except (AssertionError, Cancelled):
+                raise
+            except Exception as e:
+                log(f'HTTP select failed ({e}), falling back to Chrome...')
+
+        from slot_selector import select_slot
+        return select_slot(driver=get_driver(headless, log=log), testing=testing, headless=headless,
+                           schedules=schedules, persist=keep_session, log=log)
+
+    def watch_slots(self):
+        # Poll until a better schedule than the best open one frees up, then select it.
+        # The filters and scorer are read here, the worker thread must not touch Tk
+        filters = tuple(var.get() for var in (self.var_f1, self.var_f2, self.var_f3, self.var_f4, self.var_f5, self.var_f6))
+        watch_scorer = scorer
+
+        def task(worker):
+            from slot_watcher import start_watch
+            with trace("watch", log=worker.log):
+                choices = start_watch(testing=testing, my_subjects=my_subjects, interval=watch_interval,
+                                      filters=filters, scorer=watch_scorer, cancelled=worker.cancelled,
+                                      persist=keep_session, history=keep_history, log=worker.log)
+            worker.check_cancelled()
+            return choices
+
+        self.run_task("Watching slots...", task, on_done=lambda result: None)
+
+    def run_task(self, message, task, on_done):
+        # Scraping, solving and selecting run on the worker thread, the popup
+        # is only touched from the main thread when the worker queue is polled
+        if self.worker.busy():
+            return
+
+        popup, label = self.show_popup(message, on_cancel=self.worker.cancel)
 
         def log(msg):
             if label.winfo_exists():
                 label.config(text=label.cget("text") + "\n" + msg)
-                self.master.update()
 
-        try:
-            combo = self.filtered_combos[self.index][1]
-            subjects, l_groups, p_groups, w_groups = [], [], [], []
-
-            subject_set = set(cls["subject"] for cls in combo if cls)
-            for subject in subject_set:
-                l_group = p_group = w_group = ''
-                for cls in combo:
-                    if not cls or cls["subject"] != subject:
-                        continue
-                    if cls["Class Type"] == "Lecture":
-                        l_group = cls["Group Number"]
-                    elif cls["Class Type"] == "Practical":
-                        p_group = cls["Group Number"]
-                    elif cls["Class Type"] == "Workshop":
-                        w_group = cls["Group Number"]
-                subjects.append(subject.lower())
-                l_groups.append(f' {l_group.split(' ')[-1]} ')
-                p_groups.append(f' {p_group.split(' ')[-1]} ')
-                w_groups.append(f' {w_group.split(' ')[-1]} ')
-
-            # Patch the print to call log
-            import builtins
-            original_print = builtins.print
-
-            def patched_print(*args, **kwargs):
-                msg = " ".join(str(a) for a in args)
-                log(msg)
-
-            builtins.print = patched_print
+        def done(result):
+            on_done(result)
+            log("Done!")
+            popup.after(1500, popup.destroy)
 
-            try:
-                # from select_slot import select_slot
-                from slot_selector import select_slot
-                select_slot(driver=driver, testing=testing, headless=headless,
-                            subjects=subjects, l_groups=l_groups,
-                            p_groups=p_groups, w_groups=w_groups)
-                log("Done!")
-                popup.after(1500, popup.destroy)
-            finally:
-                builtins.print = original_print
-
-        except Exception as e:
+        def error(e):
             log(f"[ERROR] {e}")
             popup.after(2000, popup.destroy)
 
+        self.worker.run(task, on_log=log, on_done=done, on_error=error)
+
+    def reload_scoring(self):
+        # Re-rank the schedules already found with the edited scoring file, nothing is solved again
+        global scorer
+        try:
+            scorer = load_scorer()
+        except (OSError, ValueError) as e:
+            popup, _ = self.show_popup(f"[ERROR] {e}")
+            popup.after(3000, popup.destroy)
+            return
+        self.table.rescore(scorer)
+        self.set_table(self.table, self.complete)
+        self.index = 0
+        self.show_schedule()
+
     def apply_filters(self):
-        self.filtered_combos = filter_schedules(
-            self.all_combos,
+        self.filtered_combos = self.table.filter(
             self.var_f1.get(), self.var_f2.get(), self.var_f3.get(),
             self.var_f4.get(), self.var_f5.get(), self.var_f6.get()
         )
@@ -345,16 +355,47 @@ class TimetableGUI:
             self.show_schedule()
 
     def show_next(self):
+        if self.index >= len(self.filtered_combos) - 1 and self.has_more:
+            # Also when nothing ranked so far passes the filters, the next batch may have some
+            then = self.show_schedule if not self.filtered_combos else self.step_next
+            self.load_more(then=then)
+        else:
+            self.step_next()
+
+    def step_next(self):
         if self.index < len(self.filtered_combos) - 1:
             self.index += 1
             self.show_schedule()
+
+    def show_index(self, index):
+        # Jumping past the end ranks at least that many before clamping
+        if index >= len(self.filtered_combos) and self.has_more:
+            self.load_more(index + 1, then=lambda: self.jump(index))
+        else:
+            self.jump(index)
+
+    def jump(self, index):
+        index = max(0, min(index, len(self.filtered_combos) - 1))
+        if index != self.index:
+            self.index = index
+            self.show_schedule()
+
+    def show_list(self):
+        if self.list_pane and self.list_pane.exists():
+            self.list_pane.window.lift()
+        else:
+            self.list_pane = ScheduleList(self)
     
-    def show_popup(self, message, width=600, height=450, font_size=20):
+    def show_popup(self, message, width=600, height=450, font_size=20, on_cancel=None):
         popup = tk.Toplevel(self.master)
         popup.title("Status")
         popup.geometry(f"{width}x{height}")
         popup.configure(bg="black")
 
+        if on_cancel:
+            tk.Button(popup, text="Cancel", command=on_cancel, width=12,
+                      font=("Helvetica", 18)).pack(side=tk.BOTTOM, pady=(0, 20))
+
         label = tk.Label(
             popup,
             text=message,
@@ -369,101 +410,94 @@ class TimetableGUI:
         self.master.update()
         return popup, label
 
-    def refresh_slots(self):
-        popup, label = self.show_popup("Refreshing slots...")
-
-        def log(msg):
-            if label.winfo_exists():
-                label.config(text=label.cget("text") + "\n" + msg)
-                self.master.update()
-
-        import builtins
-        original_print = builtins.print
-
-        def patched_print(*args, **kwargs):
-            msg = " ".join(str(a) for a in args)
-            log(msg)
+    def rank_slots(self, limit=None, then=None):
+        # Every solve runs on the worker, it can take a while on a big page.
+        # then: what to show once ranked, the first schedule by default
+        limit = limit or self.limit
+
+        def task(worker):
+            with trace("rank", log=worker.log):
+                table = generate_schedules(subject_combinations, limit, cancelled=worker.cancelled)
+            worker.check_cancelled()
+            return table
+
+        def on_done(table):
+            global schedule_table
+            schedule_table = table
+            self.limit = limit
+            self.set_table(schedule_table)
+            if then:
+                then()
+            else:
+                self.index = 0
+                self.show_schedule()
+
+        self.run_task("Ranking schedules...", task, on_done)
 
-        # Print on GUI instead of terminal
-        builtins.print = patched_print
-
-        try:
-            from slot_scraper import start_scrape
-            start_scrape(testing=testing, driver=driver, headless=headless, my_subjects=my_subjects)
-
-            # Reload and reprocess the data
-            global df, lectures, practicals, workshops, practical_groups, workshop_groups, subject_combinations
-            global all_combos, valid_schedules
-
-            csv_path = script_dir / "scraped_files" / "slots.csv"
-            df = pd.read_csv(csv_path)
-            df["subject"] = df["Subject"].apply(lambda x: x.split(" - ")[1])
+    def refresh_slots(self):
+        # Snapshot what the worker needs, the GUI keeps using the old data until it is done
+        old_schedules = self.table.ranked() if self.complete else None
+        old_combinations = subject_combinations
+        limit = self.limit
+
+        def task(worker):
+            with trace("refresh", log=worker.log):
+                records = self.scrape(cancelled=worker.cancelled, log=worker.log)
+            worker.check_cancelled()
+
+            # Scraped records are used as they are, nothing is read back from disk
+            combinations = build_subject_combinations(records)
+
+            # Only re-solve around groups that opened or filled up since the last refresh,
+            # unless the first ranking never finished
+            if old_schedules is None:
+                ranked = rank_schedules(combinations, limit, cancelled=worker.cancelled)
+            else:
+                ranked = rerank_schedules(old_schedules, old_combinations, combinations, limit, cancelled=worker.cancelled)
+            worker.check_cancelled()
+            return records, combinations, ScheduleTable([ids for _, ids in ranked], scorer)
+
+        def on_done(result):
+            # Swap the new data in all at once
+            global slot_records, subject_combinations, schedule_table
+            slot_records, subject_combinations, schedule_table = result
 
             # Re-assign subject colors
             subject_colors.clear()
-            for i, subject in enumerate(df["subject"].unique()):
+            for i, subject in enumerate(dict.fromkeys(cls["subject"] for cls in slot_records)):
                 subject_colors[subject] = fixed_colors[i % len(fixed_colors)]
 
-            # Re-process the data
-            lectures = df[df["Class Type"] == "Lecture"]
-            practicals = df[df["Class Type"] == "Practical"]
-            workshops = df[df["Class Type"] == "Workshop"]
-
-            practical_groups = practicals.groupby("subject")
-            workshop_groups = workshops.groupby("subject")
-
-            # Regenerate subject combinations
-            subject_combinations = {}
-            for subject in lectures["subject"].unique():
-                lec = lectures[lectures["subject"] == subject].to_dict("records")
-                prac = practical_groups.get_group(subject).to_dict("records") if subject in practical_groups.groups else [{}]
-                work = workshop_groups.get_group(subject).to_dict("records") if subject in workshop_groups.groups else [{}]
-                subject_combinations[subject] = list(product(lec, prac, work))
-
-            # Regenerate all valid schedules
-            all_combos = list(product(*subject_combinations.values()))
-            valid_schedules = []
-            for combo in all_combos:
-                flat = [c for triple in combo for c in triple if c]
-                if not has_overlap(flat):
-                    score = score_schedule(flat)
-                    valid_schedules.append((score, flat))
-
-            valid_schedules.sort(key=lambda x: x[0])
-
             # Update GUI
-            self.all_combos = valid_schedules
-            self.filtered_combos = valid_schedules
+            self.set_table(schedule_table)
             self.index = 0
-            self.earliest_start = get_earliest_time(valid_schedules)
-            self.time_slots = build_dynamic_slots(valid_schedules, self.earliest_start)
             self.show_schedule()
 
-            log("Done!")
-            popup.after(1500, popup.destroy)
+        self.run_task("Refreshing slots...", task, on_done)
 
-        except Exception as e:
-            log(f"[ERROR] {e}")
-            popup.after(2000, popup.destroy)
-
-        finally:
-            builtins.print = original_print
-
-    def show_schedule(self):
+    def scrape(self, cancelled=None, log=print):
+        if browserless:
+            try:
+                from izone_client import start_http_scrape
+                return start_http_scrape(testing=testing, my_subjects=my_subjects, persist=keep_session,
+                                         export_csv=export_csv, history=keep_history, cancelled=cancelled, log=log)
+            except (AssertionError, Cancelled):
+                # Chrome logs in with the same credentials, and a cancel is a cancel
+                raise
+            except Exception as e:
+                log(f'HTTP scrape failed ({e}), falling back to Chrome...')
+
+        from slot_scraper import start_scrape
+        return start_scrape(testing=testing, driver=get_driver(headless, log=log), headless=headless,
+                            my_subjects=my_subjects, parse_html=parse_html, persist=keep_session,
+                            export_csv=export_csv, history=keep_history, log=log)
+
+    def draw_grid(self):
+        # Header and empty grid, only redrawn when the time slots change
+        slot_width, row_height, day_col_width = self.slot_width, self.row_height, self.day_col_width
         self.canvas.delete("all")
-        for widget in self.summary_frame.winfo_children():
-            widget.destroy()
-
-        slot_width = 60
-        row_height = 60
-        day_col_width = 80
-
-        if not self.filtered_combos:
-            self.label.config(text="No matching schedules.")
-            return
-
-        combo = self.filtered_combos[self.index][1]
-        self.label.config(text=f"Schedule {self.index + 1} of {len(self.filtered_combos)} (Score: {self.filtered_combos[self.index][0]})")
+        self.blocks = []
+        self.grid_layout = tuple(self.time_slots)
+        self.slot_index = {t: i for i, t in enumerate(self.time_slots)}
 
         total_width = day_col_width + len(self.time_slots) * slot_width
         total_height = (len(self.days) + 1) * row_height
@@ -473,67 +507,101 @@ class TimetableGUI:
             x0 = day_col_width + i * slot_width
             start_time = f"{t//60:02d}:{t%60:02d}"
             end_time   = f"{(t+30)//60:02d}:{(t+30)%60:02d}"
-            self.canvas.create_rectangle(x0, 0, x0 + slot_width, row_height, fill="#444444", outline="white")
-            self.canvas.create_text(x0 + slot_width//2, row_height//2 - 10, text=start_time, fill="white", font=("Helvetica", 18))
-            self.canvas.create_text(x0 + slot_width//2, row_height//2 + 10, text=end_time, fill="white", font=("Helvetica", 18))
+            self.canvas.create_rectangle(x0, 0, x0 + slot_width, row_height, fill="#444444", outline="white", tags="grid")
+            self.canvas.create_text(x0 + slot_width//2, row_height//2 - 10, text=start_time, fill="white", font=("Helvetica", 18), tags="grid")
+            self.canvas.create_text(x0 + slot_width//2, row_height//2 + 10, text=end_time, fill="white", font=("Helvetica", 18), tags="grid")
 
         for r, day in enumerate(self.days):
             y0 = (r+1) * row_height
-            self.canvas.create_rectangle(0, y0, day_col_width, y0 + row_height, fill="#333333", outline="white")
-            self.canvas.create_text(day_col_width//2, y0 + row_height//2, text=day, fill="white", font=("Helvetica", 20, "bold"))
+            self.canvas.create_rectangle(0, y0, day_col_width, y0 + row_height, fill="#333333", outline="white", tags="grid")
+            self.canvas.create_text(day_col_width//2, y0 + row_height//2, text=day, fill="white", font=("Helvetica", 20, "bold"), tags="grid")
             for i in range(len(self.time_slots)):
                 x0 = day_col_width + i * slot_width
-                self.canvas.create_rectangle(x0, y0, x0 + slot_width, y0 + row_height, fill="#222222", outline="gray")
-
-        for cls in combo:
-            if not cls: continue
-            day_idx = self.days.index(cls["Day"])
-            start_min, end_min = time_to_tuple(cls)
-            start_slot = next(i for i, t in enumerate(self.time_slots) if t == start_min)
-            col_span = max(1, (end_min - start_min) // 30)
-            x0 = day_col_width + start_slot * slot_width
-            y0 = (day_idx + 1) * row_height
-            x1 = x0 + col_span * slot_width
-            y1 = y0 + row_height
-            color = subject_colors.get(cls["subject"], "#666666")
-            self.canvas.create_rectangle(x0+2, y0+2, x1-2, y1-2, fill=color, outline="white")
-            suffix = "(L)" if cls["Class Type"] == "Lecture" else "(P)" if cls["Class Type"] == "Practical" else "(W)"
-            self.canvas.create_text((x0+x1)//2, (y0+y1)//2, 
-                                    text=f"{cls['Group Number']} {suffix}\n{cls['subject'][:30]}", 
-                                    fill="white", font=("Helvetica", 15), justify="center")
-
+                self.canvas.create_rectangle(x0, y0, x0 + slot_width, y0 + row_height, fill="#222222", outline="gray", tags="grid")
+
+    def draw_blocks(self, combo):
+        # Class blocks are a pool of (rectangle, text) items moved into place, spares are hidden
+        for n, cls in enumerate(combo):
+            if n == len(self.blocks):
+                rect = self.canvas.create_rectangle(0, 0, 0, 0, outline="white", tags="block")
+                text = self.canvas.create_text(0, 0, fill="white", font=("Helvetica", 15), justify="center", tags="block")
+                self.blocks.append((rect, text))
+            rect, text = self.blocks[n]
+
+            start_slot = self.slot_index[cls.start]
+            col_span = max(1, (cls.end - cls.start) // 30)
+            x0 = self.day_col_width + start_slot * self.slot_width
+            y0 = (cls.day_idx + 1) * self.row_height
+            x1 = x0 + col_span * self.slot_width
+            y1 = y0 + self.row_height
+
+            self.canvas.coords(rect, x0+2, y0+2, x1-2, y1-2)
+            self.canvas.itemconfigure(rect, fill=subject_colors.get(cls.subject, "#666666"), state="normal")
+            self.canvas.coords(text, (x0+x1)//2, (y0+y1)//2)
+            self.canvas.itemconfigure(text, text=f"{cls.group} {cls.class_type.suffix}\n{cls.subject[:30]}", state="normal")
+
+        for rect, text in self.blocks[len(combo):]:
+            self.canvas.itemconfigure(rect, state="hidden")
+            self.canvas.itemconfigure(text, state="hidden")
+
+    def draw_summary(self, combo):
         subject_groups = defaultdict(dict)
         for cls in combo:
-            if cls:
-                subject_groups[cls["subject"]][cls["Class Type"]] = cls
+            subject_groups[cls.subject][cls.class_type] = cls
 
+        # (text, background, is header) for every line of the summary
+        rows = []
         for subject, types in subject_groups.items():
-            color = subject_colors.get(subject, "#222222")
-            header = tk.Label(self.summary_frame, text=subject, fg="white", bg=color,
-                            font=("Helvetica", 20, "bold"), padx=5, pady=2)
-            header.pack(anchor="center", padx=50, pady=(5,0))
-
-            for typ in ["Lecture", "Practical", "Workshop"]:
+            rows.append((subject, subject_colors.get(subject, "#222222"), True))
+            for typ in ClassType:
                 if typ in types:
                     cls = types[typ]
-                    suffix = "(L)" if cls["Class Type"] == "Lecture" else "(P)" if cls["Class Type"] == "Practical" else "(W)"
-                    text = f"{cls['Group Number']} {suffix}"
-                    label = tk.Label(self.summary_frame, text=text, fg="white", bg="black",
-                                    font=("Helvetica", 18), padx=10)
+                    rows.append((f"{cls.group} {cls.class_type.suffix}", "black", False))
+
+        # Same shape as last time (nearly always), so just relabel the existing widgets
+        shape = [header for _, _, header in rows]
+        if shape != self.summary_shape:
+            for widget in self.summary_frame.winfo_children():
+                widget.destroy()
+            self.summary_labels = []
+            for _, _, header in rows:
+                if header:
+                    label = tk.Label(self.summary_frame, fg="white", font=("Helvetica", 20, "bold"), padx=5, pady=2)
+                    label.pack(anchor="center", padx=50, pady=(5,0))
+                else:
+                    label = tk.Label(self.summary_frame, fg="white", font=("Helvetica", 18), padx=10)
                     label.pack(anchor="center")
+                self.summary_labels.append(label)
+            self.summary_shape = shape
+
+        for label, (text, bg, _) in zip(self.summary_labels, rows):
+            label.config(text=text, bg=bg)
+
+    def show_schedule(self):
+        if self.list_pane and self.list_pane.exists():
+            self.list_pane.show()
+
+        if not self.filtered_combos:
+            more = f" in the best {len(self.table)}, press Next to rank more" if self.has_more else ""
+            self.label.config(text=f"No matching schedules{more}.")
+            self.draw_blocks([])
+            self.draw_summary([])
+            return
+
+        combo = get_slots(self.filtered_combos[self.index][1])
+        total = f"{len(self.filtered_combos)}+" if self.has_more else len(self.filtered_combos)
+        self.label.config(text=f"Schedule {self.index + 1} of {total} (Score: {self.filtered_combos[self.index][0]})")
 
-# Generate all valid schedules
-all_combos = list(product(*subject_combinations.values()))
-valid_schedules = []
-for combo in all_combos:
-    flat = [c for triple in combo for c in triple if c]
-    if not has_overlap(flat):
-        score = score_schedule(flat)
-        valid_schedules.append((score, flat))
+        if tuple(self.time_slots) != self.grid_layout:
+            self.draw_grid()
+        self.draw_blocks(combo)
+        self.draw_summary(combo)
 
-valid_schedules.sort(key=lambda x: x[0])
+# Filled in by the first ranking once the window is up
+schedule_table = ScheduleTable([], scorer)
 
 if __name__ == "__main__":
     root = tk.Tk()
-    gui = TimetableGUI(root, valid_schedules)
+    gui = TimetableGUI(root, schedule_table)
+    gui.rank_slots()
     root.mainloop()
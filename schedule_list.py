@@ -0,0 +1,136 @@
+from class_slot import get_slots
+import tkinter as tk
+
+ROWS = 20  # Rows on screen, only these many labels ever exist
+
+class ScheduleList:
+    def __init__(self, gui):
+        # Virtual list over gui.filtered_combos, scrolling just relabels the same rows
+        self.gui = gui
+        self.first = 0
+
+        self.window = tk.Toplevel(gui.master)
+        self.window.title("Schedules")
+        self.window.configure(bg="black")
+        self.window.geometry("900x640")
+
+        top = tk.Frame(self.window, bg="black")
+        top.pack(fill=tk.X, padx=10, pady=10)
+
+        tk.Label(top, text="Go to", bg="black", fg="white", font=("Helvetica", 15)).pack(side=tk.LEFT)
+        self.jump_entry = tk.Entry(top, width=8, font=("Helvetica", 15))
+        self.jump_entry.pack(side=tk.LEFT, padx=(5, 20))
+        self.jump_entry.bind("<Return>", lambda e: self.jump())
+
+        tk.Label(top, text="Find group", bg="black", fg="white", font=("Helvetica", 15)).pack(side=tk.LEFT)
+        self.search_entry = tk.Entry(top, width=16, font=("Helvetica", 15))
+        self.search_entry.pack(side=tk.LEFT, padx=5)
+        self.search_entry.bind("<Return>", lambda e: self.search())
+
+        self.status = tk.Label(top, text="", bg="black", fg="white", font=("Helvetica", 15))
+        self.status.pack(side=tk.RIGHT)
+
+        body = tk.Frame(self.window, bg="black")
+        body.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+
+        self.scrollbar = tk.Scrollbar(body, orient="vertical", command=self.on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        rows_frame = tk.Frame(body, bg="black")
+        rows_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        tk.Label(rows_frame, text=f"{'#':>6}  {'Score':>6}  Days  {'Gaps':>6}  Groups", bg="#444444", fg="white",
+                 font=("Courier", 14, "bold"), anchor="w").pack(fill=tk.X)
+
+        self.labels = []
+        for n in range(ROWS):
+            label = tk.Label(rows_frame, text="", bg="black", fg="white", font=("Courier", 14), anchor="w")
+            label.pack(fill=tk.X)
+            label.bind("<Button-1>", lambda e, n=n: self.open_row(self.first + n))
+            label.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1))
+            label.bind("<Button-4>", lambda e: self.scroll(-1))
+            label.bind("<Button-5>", lambda e: self.scroll(1))
+            self.labels.append(label)
+
+        # Keyboard paging moves the shown schedule, the list follows it
+        for key, step in (("<Up>", -1), ("<Down>", 1), ("<Prior>", -ROWS), ("<Next>", ROWS)):
+            self.window.bind(key, lambda e, step=step: self.move(step))
+        self.window.bind("<Home>", lambda e: self.open_row(0))
+        self.window.bind("<End>", lambda e: self.open_row(len(self.gui.filtered_combos) - 1))
+
+        self.show()
+
+    def exists(self):
+        return self.window.winfo_exists()
+
+    def show(self):
+        # Keep the current schedule on screen and relabel the visible rows
+        combos = self.gui.filtered_combos
+        index = self.gui.index
+        if index < self.first:
+            self.first = index
+        elif index >= self.first + ROWS:
+            self.first = index - ROWS + 1
+        self.first = max(0, min(self.first, len(combos) - ROWS))
+        self.render()
+
+    def render(self):
+        combos = self.gui.filtered_combos
+        for n, label in enumerate(self.labels):
+            i = self.first + n
+            if i >= len(combos):
+                label.config(text="", bg="black")
+                continue
+            score, days, gap = combos.describe(i)
+            label.config(text=f"{i + 1:>6}  {score:>6}  {days:>4}  {gap:>5}m  {group_summary(combos[i][1])}",
+                         bg="#0020C2" if i == self.gui.index else "black")
+
+        total = max(len(combos), 1)
+        self.scrollbar.set(self.first / total, min(self.first + ROWS, total) / total)
+
+    def on_scroll(self, action, amount, unit=None):
+        # Scrollbar protocol: ("moveto", fraction) or ("scroll", n, "units"/"pages")
+        if action == "moveto":
+            self.first = int(float(amount) * len(self.gui.filtered_combos))
+            self.scroll(0)
+        else:
+            self.scroll(int(amount) * (ROWS if unit == "pages" else 1))
+
+    def scroll(self, step):
+        # Scrolling only moves the view, not the shown schedule
+        self.first = max(0, min(self.first + step, len(self.gui.filtered_combos) - ROWS))
+        self.render()
+
+    def move(self, step):
+        self.open_row(self.gui.index + step)
+
+    def open_row(self, i):
+        self.gui.show_index(i)
+
+    def jump(self):
+        try:
+            self.open_row(int(self.jump_entry.get()) - 1)
+        except ValueError:
+            self.status.config(text="Not a number")
+
+    def search(self):
+        # Next match after the current schedule, wrapping around
+        combos = self.gui.filtered_combos
+        found = combos.find_group(self.search_entry.get(), start=self.gui.index + 1) if len(combos) else None
+        if found is None:
+            self.status.config(text="No match")
+        else:
+            self.status.config(text="")
+            self.open_row(found)
+
+def group_summary(ids):
+    # "WEB L1 P2 | OS L3 W1", subjects shortened to their initials
+    subjects = {}
+    for cls in get_slots(ids):
+        subjects.setdefault(cls.subject, []).append(cls)
+    parts = []
+    for subject, classes in subjects.items():
+        short = "".join(word[0] for word in subject.split() if word[0].isalnum()).upper()
+        groups = " ".join(f"{cls.class_type.label[0]}{cls.group.split(' ')[-1]}" for cls in sorted(classes, key=lambda c: c.class_type))
+        parts.append(f"{short} {groups}")
+    return " | ".join(parts)
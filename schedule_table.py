@@ -0,0 +1,152 @@
+from slot_solver import DAYS, LONG_GAP_MINUTES, SCORE_WEIGHTS
+from class_slot import slots
+import numpy as np
+
+# Per-schedule columns, all kept in ranked order
+COLUMNS = ("position", "ids", "day", "start", "end", "base_score", "score", "allowed", "school_days",
+           "single_days", "total_gap", "long_gaps", "large_gap_days", "has_large_gap", "has_single_class_day")
+
+class ScheduleTable:
+    def __init__(self, schedules, scorer=None):
+        # schedules: list of slot ID tuples from rank_schedules, scorer: a compiled scoring.Scorer
+        n = len(schedules)
+        width = max((len(ids) for ids in schedules), default=0)
+
+        # One row per schedule, one column per class (ID -1 = padding)
+        ids = np.full((n, width), -1, dtype=np.int32)
+        for row, schedule in enumerate(schedules):
+            ids[row, :len(schedule)] = schedule
+
+        # Look every class up in the slot table at once, the extra last entry is the padding
+        table = list(slots)
+        self.day = np.array([cls.day_idx for cls in table] + [-1], dtype=np.int8)[ids]
+        self.start = np.array([cls.start for cls in table] + [0], dtype=np.int16)[ids]
+        self.end = np.array([cls.end for cls in table] + [0], dtype=np.int16)[ids]
+
+        self.compute_features()
+        self.ids = ids
+        self.position = np.arange(n)
+        self.candidates = list(schedules)
+        self.rescore(scorer)
+
+    def rescore(self, scorer=None):
+        # Rank the same candidates by the default score or a scoring spec,
+        # ties keep the solver's order
+        if scorer is None:
+            self.score, self.allowed = self.base_score, np.ones(len(self.candidates), dtype=bool)
+        else:
+            self.score, self.allowed = scorer.evaluate(self)
+
+        order = np.lexsort((self.position, self.score))
+        for name in COLUMNS:
+            setattr(self, name, getattr(self, name)[order])
+        self.candidates = [self.candidates[i] for i in order]
+        self.schedules = [(int(score), ids) for score, ids in zip(self.score, self.candidates)]
+        self.build_index()
+
+    def ranked(self):
+        # (default score, ids) pairs, what rerank_schedules expects
+        return [(int(score), ids) for score, ids in zip(self.base_score, self.candidates)]
+
+    def __len__(self):
+        return len(self.schedules)
+
+    def compute_features(self):
+        n = self.day.shape[0]
+
+        # Sort each schedule's classes by (day, start)
+        key = np.where(self.day >= 0, self.day.astype(np.int32) * 1440 + self.start, np.iinfo(np.int32).max)
+        order = np.argsort(key, axis=1)
+        day = np.take_along_axis(self.day, order, axis=1)
+        start = np.take_along_axis(self.start, order, axis=1).astype(np.int32)
+        end = np.take_along_axis(self.end, order, axis=1).astype(np.int32)
+
+        # Classes per day
+        counts = np.zeros((n, len(DAYS)), dtype=np.int16)
+        for d in range(len(DAYS)):
+            counts[:, d] = (day == d).sum(axis=1)
+        self.school_days = (counts > 0).sum(axis=1)
+        self.single_days = (counts == 1).sum(axis=1)
+
+        # Gaps between consecutive classes on the same day
+        same_day = (day[:, 1:] == day[:, :-1]) & (day[:, 1:] >= 0)
+        gaps = np.where(same_day, start[:, 1:] - end[:, :-1], 0)
+        long_gaps = same_day & (gaps >= LONG_GAP_MINUTES)
+
+        self.long_gaps = long_gaps.sum(axis=1)
+        large_gap_days = np.zeros(n, dtype=np.int16)
+        for d in range(len(DAYS)):
+            large_gap_days += (long_gaps & (day[:, 1:] == d)).any(axis=1)
+        self.large_gap_days = large_gap_days
+        self.has_large_gap = large_gap_days > 0
+        self.has_single_class_day = self.single_days > 0
+
+        self.total_gap = gaps.sum(axis=1)
+        # Same weights as score_schedule, so the solver's ranking carries over
+        w = SCORE_WEIGHTS
+        self.base_score = (w["gap_minutes"] * self.total_gap + w["single_class_day"] * self.single_days
+                           + w["long_gap"] * self.long_gaps + w["day_off"] * (5 - self.school_days))
+
+    def build_index(self):
+        # One packed bitset per checkbox, bit i set if schedule i passes it
+        passes = [
+            self.school_days == 4,
+            self.school_days == 3,
+            self.school_days == 2,
+            ~self.has_large_gap,
+            self.large_gap_days <= 1,
+            ~self.has_single_class_day,
+        ]
+        self.index_bits = [np.packbits(keep) for keep in passes]
+        self.all_bits = np.packbits(self.allowed)
+        self.filter_cache = {}
+
+    def filter(self, f1, f2, f3, f4, f5, f6):
+        flags = (bool(f1), bool(f2), bool(f3), bool(f4), bool(f5), bool(f6))
+        if flags not in self.filter_cache:
+            bits = self.all_bits
+            for flag, feature_bits in zip(flags, self.index_bits):
+                if flag:
+                    bits = bits & feature_bits
+            keep = np.unpackbits(bits, count=len(self.schedules)).astype(bool)
+            self.filter_cache[flags] = ScheduleView(self, np.flatnonzero(keep))
+        return self.filter_cache[flags]
+
+    def find_group(self, rows, query, start=0):
+        # First of rows (from start, wrapping around) with a group matching the query,
+        # "3" is group 3 of any subject, "web 3" narrows it to subjects containing "web"
+        words = query.lower().split()
+        if not words or len(rows) == 0:
+            return None
+        number, subject = words[-1], " ".join(words[:-1])
+        wanted = [cls.id for cls in slots if cls.group.split(" ")[-1] == number and subject in cls.subject.lower()]
+        if not wanted:
+            return None
+
+        order = np.roll(np.arange(len(rows)), -start)
+        hits = np.isin(self.ids[rows[order]], wanted).any(axis=1)
+        if not hits.any():
+            return None
+        return int(order[np.argmax(hits)])
+
+class ScheduleView:
+    # Filtered rows of a table, (score, ids) pairs are only looked up when asked for
+    def __init__(self, table, rows):
+        self.table = table
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.table.schedules[row] for row in self.rows[i]]
+        return self.table.schedules[self.rows[i]]
+
+    def describe(self, i):
+        # (score, school days, total gap in minutes) for the list pane
+        row = self.rows[i]
+        return int(self.table.score[row]), int(self.table.school_days[row]), int(self.table.total_gap[row])
+
+    def find_group(self, query, start=0):
+        return self.table.find_group(self.rows, query, start)
@@ -0,0 +1,118 @@
+from slot_solver import DAYS, SCORE_WEIGHTS
+from class_slot import slots
+from pathlib import Path
+import numpy as np
+import tomllib
+import json
+import re
+
+# score_schedule's weights plus ones it leaves out, lower scores rank first
+DEFAULT_WEIGHTS = {
+    **SCORE_WEIGHTS,
+    'early_minutes': 0,       # per minute a class starts before earliest_start
+    'late_minutes': 0,        # per minute a class ends after latest_end
+    'busy_day_off': 0,        # per preferred day off that has classes
+    'preferred_teacher': 0,   # per class taught by one of teachers (make it negative)
+    'avoided_teacher': 0,     # per class taught by one of avoid_teachers
+}
+
+DEFAULT_SPEC = {
+    'weights': DEFAULT_WEIGHTS,
+    'earliest_start': None,   # "09:00"
+    'latest_end': None,       # "18:00"
+    'days_off': [],           # ["FRI"]
+    'teachers': [],           # parts of teacher names, case does not matter
+    'avoid_teachers': [],
+    'hard': [],               # constraints that drop schedules instead of costing points
+}
+
+HARD_CONSTRAINTS = ['earliest_start', 'latest_end', 'days_off', 'avoid_teachers']
+
+def load_spec(path):
+    # TOML or JSON, anything left out keeps its default
+    path = Path(path)
+    if path.suffix == '.json':
+        spec = json.loads(path.read_text(encoding='utf-8'))
+    else:
+        spec = tomllib.loads(path.read_text(encoding='utf-8'))
+
+    if not isinstance(spec, dict) or not isinstance(spec.get('weights', {}), dict):
+        raise ValueError(f'{path.name} must be a table of settings with a [weights] table')
+
+    unknown = set(spec) - set(DEFAULT_SPEC) | set(spec.get('weights', {})) - set(DEFAULT_WEIGHTS)
+    if unknown:
+        raise ValueError(f'Unknown scoring keys in {path.name}: {", ".join(sorted(unknown))}')
+
+    # Wrong types would only fail later, halfway through scoring
+    for key, value in spec.get('weights', {}).items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f'Weight {key} in {path.name} must be a number, not {value!r}')
+    for key in ('earliest_start', 'latest_end'):
+        value = spec.get(key)
+        if value is not None and not (isinstance(value, str) and re.fullmatch(r'\d{1,2}:\d{2}', value)):
+            raise ValueError(f'{key} in {path.name} must be a time like "09:00", not {value!r}')
+    for key in ('days_off', 'teachers', 'avoid_teachers', 'hard'):
+        value = spec.get(key, [])
+        if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+            raise ValueError(f'{key} in {path.name} must be a list of names, not {value!r}')
+
+    unknown = {day.upper() for day in spec.get('days_off', [])} - set(DAYS)
+    if unknown:
+        raise ValueError(f'Unknown days_off in {path.name}: {", ".join(sorted(unknown))} (use {", ".join(DAYS)})')
+    unknown = set(spec.get('hard', [])) - set(HARD_CONSTRAINTS)
+    if unknown:
+        raise ValueError(f'Only {", ".join(HARD_CONSTRAINTS)} can be hard, not {", ".join(sorted(unknown))}')
+
+    return {**DEFAULT_SPEC, **spec, 'weights': {**DEFAULT_WEIGHTS, **spec.get('weights', {})}}
+
+def to_minutes(text):
+    if text is None:
+        return None
+    h, m = map(int, text.split(':'))
+    return h * 60 + m
+
+class Scorer:
+    def __init__(self, spec=DEFAULT_SPEC):
+        # Everything that does not depend on the schedules is worked out once here
+        self.weights = spec['weights']
+        self.earliest = to_minutes(spec['earliest_start'])
+        self.latest = to_minutes(spec['latest_end'])
+        self.days_off = [DAYS.index(day.upper()) for day in spec['days_off']]
+        self.teachers = [name.lower() for name in spec['teachers']]
+        self.avoid_teachers = [name.lower() for name in spec['avoid_teachers']]
+        self.hard = set(spec['hard'])
+
+    def teacher_flags(self, names):
+        # One flag per slot ID, the extra last entry is the padding in table.ids
+        return np.array([any(name in cls.teacher.lower() for name in names) for cls in slots] + [False])
+
+    def evaluate(self, table):
+        # (score, allowed) for every row of a ScheduleTable, in its current order
+        w = self.weights
+        valid = table.day >= 0
+        start = table.start.astype(np.int32)
+        end = table.end.astype(np.int32)
+
+        score = (w['gap_minutes'] * table.total_gap + w['single_class_day'] * table.single_days
+                 + w['long_gap'] * table.long_gaps + w['day_off'] * (5 - table.school_days)).astype(np.float64)
+        allowed = np.ones(len(score), dtype=bool)
+
+        # Each term is the amount of violation per schedule, hard ones also drop the schedule
+        terms = []
+        if self.earliest is not None:
+            terms.append(('earliest_start', 'early_minutes', np.where(valid, np.maximum(self.earliest - start, 0), 0).sum(axis=1)))
+        if self.latest is not None:
+            terms.append(('latest_end', 'late_minutes', np.where(valid, np.maximum(end - self.latest, 0), 0).sum(axis=1)))
+        if self.days_off:
+            terms.append(('days_off', 'busy_day_off', sum((table.day == day).any(axis=1) for day in self.days_off)))
+        if self.avoid_teachers:
+            terms.append(('avoid_teachers', 'avoided_teacher', self.teacher_flags(self.avoid_teachers)[table.ids].sum(axis=1)))
+        if self.teachers:
+            terms.append(('teachers', 'preferred_teacher', self.teacher_flags(self.teachers)[table.ids].sum(axis=1)))
+
+        for constraint, weight, amount in terms:
+            score += w[weight] * amount
+            if constraint in self.hard:
+                allowed &= amount == 0
+
+        return np.rint(score).astype(np.int64), allowed
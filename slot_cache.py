@@ -0,0 +1,55 @@
+from slot_parser import export_slots, EXPORT_COLUMNS
+from slot_solver import DAYS, time_to_tuple
+from pathlib import Path
+import numpy as np
+import csv
+
+# Scraped slots as one array per column, written with np.savez (no pickling)
+cache_path = Path(__file__).resolve().parent / 'scraped_files' / 'slots.npz'
+csv_path = cache_path.with_suffix('.csv')
+
+TEXT_COLUMNS = EXPORT_COLUMNS + ['subject']
+INT_COLUMNS = ['day_idx', 'start', 'end']
+
+def prepare_records(records, log=print):
+    # Fields derived from the text are worked out once, right after scraping.
+    # Groups without a period yet ('-00:00:00-00:00:00') cannot be placed and are dropped
+    prepared = []
+    for cls in records:
+        if not cls['Day']:
+            log(f'Skipping {cls["Subject"]} {cls["Group Number"]}: no day set')
+            continue
+        cls['subject'] = cls['Subject'].split(' - ')[1]
+        cls['day_idx'] = DAYS.index(cls['Day'])
+        cls['start'], cls['end'] = time_to_tuple(cls)
+        prepared.append(cls)
+    return prepared
+
+def save_slots(records, path=cache_path, export_csv=False, log=print):
+    log('\nSaving data...')
+    arrays = {col: np.array([str(cls.get(col, '')) for cls in records], dtype=str) for col in TEXT_COLUMNS}
+    arrays.update({col: np.array([cls[col] for cls in records], dtype=np.int16) for col in INT_COLUMNS})
+
+    with open(path, 'wb') as f:
+        np.savez(f, **arrays)
+    log(f'Data successfully saved to "{Path(path).name}"')
+
+    if export_csv:
+        export_slots(records, path=csv_path, log=log)
+
+def load_slots(path=cache_path):
+    with np.load(path) as data:
+        columns = {col: data[col].tolist() for col in TEXT_COLUMNS + INT_COLUMNS}
+    return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+def load_csv(path=csv_path, log=print):
+    with open(path, newline='', encoding='utf-8') as f:
+        return prepare_records(list(csv.DictReader(f)), log=log)
+
+def load_cached_slots(log=print):
+    # Older installs only have the CSV
+    if cache_path.exists():
+        return load_slots()
+    if csv_path.exists():
+        return load_csv(log=log)
+    return []
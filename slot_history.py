@@ -0,0 +1,99 @@
+from pathlib import Path
+import sqlite3
+import time
+
+# Append-only log of every scrape: one snapshot row per scrape and one
+# observation per group seen in it, full or not
+history_path = Path(__file__).resolve().parent / 'scraped_files' / 'history.sqlite'
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    taken_at REAL NOT NULL,
+    source TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS observations (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots(id),
+    group_id TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    class_type TEXT NOT NULL,
+    group_number TEXT NOT NULL,
+    full INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS observations_group ON observations (group_id, snapshot_id);
+CREATE INDEX IF NOT EXISTS observations_subject ON observations (subject, snapshot_id);
+'''
+
+def connect(path=history_path):
+    db = sqlite3.connect(path)
+    db.executescript(SCHEMA)
+    return db
+
+def record_snapshot(records, source='scrape', taken_at=None, path=history_path, log=print):
+    # records need 'Class ID' and 'Full' (parse_slots(include_full=True))
+    with connect(path) as db:
+        snapshot_id = db.execute(
+            'INSERT INTO snapshots (taken_at, source) VALUES (?, ?)', (taken_at or time.time(), source)
+        ).lastrowid
+        db.executemany(
+            'INSERT INTO observations VALUES (?, ?, ?, ?, ?, ?)',
+            [(snapshot_id, str(cls['Class ID']), cls['Subject'], cls['Class Type'], cls['Group Number'], int(cls['Full']))
+             for cls in records]
+        )
+    db.close()
+    log(f'Recorded {len(records)} groups in history')
+    return snapshot_id
+
+def group_history(group_id, path=history_path):
+    # [(taken_at, full)] oldest first
+    with connect(path) as db:
+        rows = db.execute('''
+            SELECT s.taken_at, o.full FROM observations o JOIN snapshots s ON s.id = o.snapshot_id
+            WHERE o.group_id = ? ORDER BY o.snapshot_id
+        ''', (str(group_id),)).fetchall()
+    db.close()
+    return [(taken_at, bool(full)) for taken_at, full in rows]
+
+def last_opened(group_id, path=history_path):
+    # When the group was last seen open right after being seen full, None if never
+    with connect(path) as db:
+        row = db.execute('''
+            SELECT MAX(taken_at) FROM (
+                SELECT s.taken_at, o.full, LAG(o.full) OVER (ORDER BY o.snapshot_id) AS was_full
+                FROM observations o JOIN snapshots s ON s.id = o.snapshot_id
+                WHERE o.group_id = ?
+            ) WHERE full = 0 AND was_full = 1
+        ''', (str(group_id),)).fetchone()
+    db.close()
+    return row[0]
+
+def fill_rates(since=None, source='scrape', path=history_path):
+    # {subject: share of observed groups that were full}, from full scrapes only
+    # since watch polls only look at a handful of groups
+    with connect(path) as db:
+        rows = db.execute('''
+            SELECT o.subject, AVG(o.full) FROM observations o JOIN snapshots s ON s.id = o.snapshot_id
+            WHERE s.source = ? AND s.taken_at >= ?
+            GROUP BY o.subject ORDER BY o.subject
+        ''', (source, since or 0)).fetchall()
+    db.close()
+    return dict(rows)
+
+if __name__ == '__main__':
+    if not history_path.exists():
+        print('No history yet, scrape at least once')
+    else:
+        print('Fill rate per subject:')
+        for subject, rate in fill_rates().items():
+            print(f'  {rate * 100:5.1f}%  {subject}')
+
+        print('\nLast opened:')
+        with connect() as db:
+            groups = db.execute('''
+                SELECT DISTINCT group_id, subject, class_type, group_number FROM observations ORDER BY subject, class_type, group_number
+            ''').fetchall()
+        db.close()
+        for group_id, subject, class_type, group_number in groups:
+            opened = last_opened(group_id)
+            if opened:
+                print(f'  {time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(opened))}  {subject} {class_type} {group_number}')
@@ -0,0 +1,148 @@
+from concurrent.futures import ThreadPoolExecutor
+from html import unescape
+from pathlib import Path
+from lxml import html
+import time
+import csv
+import os
+import re
+
+# period-time-str is filled in by an inline script after each group row:
+# var radio_check = document.getElementById('DACC006L-718028');radio_check.setAttribute('period-time-str', 'MON-14:00:00-16:00:00');
+PERIOD_SCRIPT = re.compile(
+    r"getElementById\('([^']+)'\);\s*radio_check\.setAttribute\('period-time-str',\s*'([^']*)'\)"
+)
+
+CLASS_TYPES = ['Lecture', 'Practical', 'Workshop']
+EXPORT_COLUMNS = ['Subject', 'Class Type', 'Group Number', 'Teacher', 'Day', 'Start Time', 'End Time', 'Radio Name', 'Class ID']
+
+# Each subject is a self-contained <div class="mySubject"> block, the
+# page is split on these so subjects can be parsed on their own
+SUBJECT_START = re.compile(r'<div class="mySubject"')
+SUBJECT_NAME = re.compile(r'<label>(.*?)</label>', re.S)
+
+# lxml releases the GIL while parsing, so threads are enough here
+PARSE_WORKERS = min(4, os.cpu_count() or 1)
+
+def parse_slots(page_source, my_subjects, include_full=False, workers=PARSE_WORKERS, log=print):
+    # Only my subjects are parsed, the rest is skipped on the name alone
+    fragments = [f for f in split_subjects(page_source) if is_my_subject(subject_name(f), my_subjects)]
+
+    if workers > 1 and len(fragments) > 1:
+        with ThreadPoolExecutor(max_workers=min(workers, len(fragments))) as executor:
+            results = list(executor.map(lambda f: parse_subject(f, include_full, log), fragments))
+    else:
+        results = [parse_subject(f, include_full, log) for f in fragments]
+
+    return [row for rows in results for row in rows]
+
+def parse_subject(fragment, include_full=False, log=print):
+    periods = dict(PERIOD_SCRIPT.findall(fragment))
+    subject = html.fromstring(fragment)
+    data = []
+
+    info = {}
+    info['Subject'] = clean_text(subject.xpath('.//label')[0].text_content())
+
+    # Tables are lecture, practical, workshop in that order
+    for table, class_type in zip(subject.xpath('.//table'), CLASS_TYPES):
+        info['Class Type'] = class_type
+        parse_section(table, info, periods, data, include_full, log)
+
+    return data
+
+def parse_section(table, info, periods, data, include_full=False, log=print):
+    for thead in table.xpath('.//thead[@class="izoneThead"]'):
+        radio = thead.xpath('.//input')[0]
+
+        # Skip groups that are full (the watcher keeps them to wait for a spot)
+        full = is_full(thead)
+        if full and not include_full:
+            continue
+        if include_full:
+            info['Full'] = full
+
+        # Radio name and value are what the enrollment form posts
+        info['Radio Name'] = radio.get('name')
+        info['Class ID'] = radio.get('value')
+
+        # Group number, teacher
+        strong = clean_text(thead.xpath('.//strong')[0].text_content())
+        info['Group Number'], info['Teacher'] = strong.split(' : ')
+
+        # Day, time (attribute is empty in the source, the script sets it)
+        time_data = radio.get('period-time-str') or periods.get(radio.get('id'), '')
+        if '|' in time_data:
+            log(f'Skipping {info["Subject"]} {info["Group Number"]}: multiple periods not supported')
+            continue
+        info['Day'], info['Start Time'], info['End Time'] = time_data.split('-')
+
+        # Data cleaning
+        info['Start Time'] = info['Start Time'][:-3]
+        info['End Time'] = info['End Time'][:-3]
+
+        data.append(info.copy())
+
+def export_slots(data, path='scraped_files/slots.csv', log=print):
+    log('\nExporting data...')
+    try:
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=EXPORT_COLUMNS, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(data)
+        log(f'Data successfully exported to "{Path(path).name}"')
+        return True
+
+    except Exception as e:
+        # May run on the worker thread, so there is nobody to ask, the scrape itself is kept
+        log(f'Export error: {e}')
+        return False
+
+# Helper Functions
+def split_subjects(page_source):
+    starts = [m.start() for m in SUBJECT_START.finditer(page_source)]
+    if not starts:
+        return []
+
+    # The last subject ends with the form
+    end = page_source.find('</form>', starts[-1])
+    ends = starts[1:] + [end if end != -1 else len(page_source)]
+    return [page_source[start:end] for start, end in zip(starts, ends)]
+
+def subject_name(fragment):
+    match = SUBJECT_NAME.search(fragment)
+    return clean_text(unescape(re.sub(r'<[^>]+>', '', match.group(1)))) if match else ''
+
+def clean_text(text):
+    # Match Selenium's .text: &nbsp; becomes a space, whitespace collapsed
+    return ' '.join(text.replace('\xa0', ' ').split())
+
+def is_my_subject(name, my_subjects):
+    for myS in my_subjects:
+        if myS in name.lower():
+            return True
+    return False
+
+def is_full(thead):
+    # The "(Temporarily Full)" marker is always in the page, only shown when full
+    for marker in thead.xpath('.//p[starts-with(@id, "cap-full-")]'):
+        style = marker.get('style', '').replace(' ', '')
+        if 'display:none' not in style:
+            return True
+    return False
+
+if __name__ == '__main__':
+    my_subjects = [
+        'web fundamentals',
+        'operating system fundamentals',
+        'information systems analysis & design'
+    ]
+    page_source = Path('test_html/3choose.html').read_text(encoding='utf-8')
+
+    start_time = time.perf_counter()
+    data = parse_slots(page_source, my_subjects)
+    end_time = time.perf_counter()
+
+    for row in data:
+        print(row)
+    print(f'\nParsed {len(data)} groups in {(end_time - start_time) * 1000:.1f}ms')
@@ -1,14 +1,12 @@
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
-from selenium import webdriver
-from pathlib import Path
-import pandas as pd
-import keyring
+from driver_setup import init_driver
+from izone_session import get_session
+from waits import make_wait, expand_all
+from slot_parser import parse_slots
+from slot_cache import prepare_records, save_slots
+from slot_history import record_snapshot
+from tracing import trace, span
 import time
 
 # Note 
@@ -23,72 +21,19 @@ period-time-str = "TUE-20:00:00-22:00:00|THU-20:00:00-22:00:00"
 '''
 
 class SlotScraper:
-    def __init__(self, driver, headless, my_subjects):
+    def __init__(self, driver, headless, my_subjects, log=print):
+        self.log = log
         if driver:
             self.driver = driver
         else:
             self.driver = self.init_driver(headless)
 
-        self.wait = WebDriverWait(self.driver, 2)
+        self.wait = make_wait(self.driver)
         self.data = []
         self.my_subjects = my_subjects
 
     def init_driver(self, headless):
-        print('Setting up webdriver...')
-
-        options = Options()
-        if headless:
-            options.add_argument('--headless')
-
-        # Use Service with WebDriver Manager
-        service = Service(ChromeDriverManager().install())
-        return webdriver.Chrome(service=service, options=options)
-    
-    def get_page(self, testing):
-        print('Fetching page...')
-
-        if testing:
-            print()
-            self.driver.get(Path('test_html/3choose.html').resolve().as_uri())
-        else:
-            self.driver.get('https://izone.sunway.edu.my/login')
-    
-    def login(self):
-        print('Logging in...')
-
-        input_un = self.wait.until(EC.presence_of_element_located((By.ID, 'student_uid')))
-        input_pw = self.wait.until(EC.presence_of_element_located((By.ID, 'password')))
-        submit_btn = self.wait.until(EC.presence_of_element_located((By.ID, 'submit')))
-
-        input_un.send_keys(keyring.get_password('izone', 'username'))
-        input_pw.send_keys(keyring.get_password('izone', 'password'))
-        submit_btn.click()
-
-    def enroll(self):
-        print('Enrolling...')
-
-        while True:
-            try:
-                # Enroll btn
-                self.wait.until(
-                    EC.element_to_be_clickable((By.XPATH, '//div[@id="panel-dashboard-profile"]//a[@class="btn btn-default"]'))
-                ).click()
-                break
-
-            except TimeoutException:
-                # Reload
-                self.wait.until(
-                    EC.element_to_be_clickable((By.ID, 'reloadUrl'))
-                ).click()
-                print('Button not found. Refreshing...')
-    
-    def check_tnc(self):
-        try:
-            self.wait.until(
-                EC.element_to_be_clickable((By.ID, 'chk_confirm'))
-            ).click()
-        except TimeoutException:  # If chosen
-            self.driver.find_element(By.XPATH, '//button[@name="btn_edit"]').click()
+        return init_driver(headless, log=self.log)
     
     def scrape(self):
         subjects = self.wait.until(EC.presence_of_all_elements_located((By.CLASS_NAME, 'mySubject')))
@@ -98,29 +43,39 @@ class SlotScraper:
 
             # Check if its my subject
             if (self.isMySubject(name)):
-                print(f'Scraping "{name}"...')
-
-                info = {}
-                info['Subject'] = name
-
-                # Expand dropdowns
-                self.expand_dd(subject)    
-
-                # Scrape lectures
-                tables = subject.find_elements(By.XPATH, './/table')
-                self.scrape_section(tables[0], info, 'Lecture')
-
-                # Scrape practicals
-                try:
-                    self.scrape_section(tables[1], info, 'Practical')
-                except IndexError:
-                    pass
-
-                # Scrape workshops
-                try:
-                    self.scrape_section(tables[2], info, 'Workshop')
-                except IndexError:
-                    pass
+                self.log(f'Scraping "{name}"...')
+
+                with span('scrape subject', subject=name):
+                    info = {}
+                    info['Subject'] = name
+
+                    # Scrape lectures
+                    tables = subject.find_elements(By.XPATH, './/table')
+                    self.scrape_section(tables[0], info, 'Lecture')
+
+                    # Scrape practicals
+                    try:
+                        self.scrape_section(tables[1], info, 'Practical')
+                    except IndexError:
+                        pass
+
+                    # Scrape workshops
+                    try:
+                        self.scrape_section(tables[2], info, 'Workshop')
+                    except IndexError:
+                        pass
+
+    def expand(self):
+        # Every dropdown in one call, .text is empty for collapsed panels
+        with span('expand'):
+            self.wait.until(EC.presence_of_all_elements_located((By.CLASS_NAME, 'mySubject')))
+            expand_all(self.driver)
+
+    def scrape_html(self):
+        # Grab the page once and parse it locally instead of querying every element
+        with span('parse'):
+            self.wait.until(EC.presence_of_all_elements_located((By.CLASS_NAME, 'mySubject')))
+            self.data.extend(parse_slots(self.driver.page_source, self.my_subjects, include_full=True, log=self.log))
 
     def scrape_section(self, table, info, class_type):
         info['Class Type'] = class_type
@@ -129,15 +84,19 @@ class SlotScraper:
         for thead in theads:
             text = thead.text
 
-            # Skip groups that are full
-            if 'Temporarily Full' in text:
-                continue
+            # Full groups are kept for the history and dropped on export
+            info['Full'] = 'Temporarily Full' in text
+
+            # Scrape radio name and value (class ID) for direct selection
+            radio = thead.find_element(By.XPATH, './/input')
+            info['Radio Name'] = radio.get_attribute('name')
+            info['Class ID'] = radio.get_attribute('value')
 
             # Scrape group number, teacher
             info['Group Number'], info['Teacher'] = thead.find_element(By.XPATH, './/strong').text.split(' : ')
 
             # Scrape day, time
-            time_data = thead.find_element(By.XPATH, './/input').get_attribute('period-time-str')
+            time_data = radio.get_attribute('period-time-str')
             info['Day'], info['Start Time'], info['End Time'] = time_data.split('-')
 
             # Data cleaning
@@ -147,17 +106,13 @@ class SlotScraper:
             # Add to data
             self.data.append(info.copy())
 
-    def export(self):
-        print('\nExporting data...')
-        try:
-            df = pd.DataFrame(self.data)
-            df.index += 1
-            df.to_csv('scraped_files/slots.csv', index=False)
-            print(f'Data successfully exported to "slots.csv"')
-
-        except Exception as e:
-            print(e)
-            input('Export error. Continue? ')
+    def export(self, export_csv=False, history=False):
+        with span('export'):
+            if history:
+                record_snapshot(self.data, log=self.log)
+            data = prepare_records([cls for cls in self.data if not cls['Full']], log=self.log)
+            save_slots(data, export_csv=export_csv, log=self.log)
+        return data
 
     # Helper Functions
     def isMySubject(self, name):
@@ -166,38 +121,27 @@ class SlotScraper:
                 return True
         return False
 
-    def expand_dd(self, subject):
-        panel_groups = subject.find_elements(By.CLASS_NAME, 'panel-group')
-        for panel_group in panel_groups:
-            
-            # Try expand dropdown
-            try:
-                panel_group.find_element(By.XPATH, './/span[contains(@class, "glyphicon-chevron-down")]').click()
-                time.sleep(0.2)
-            except NoSuchElementException:
-                pass
-
-def start_scrape(testing, driver, headless, my_subjects):
+def start_scrape(testing, driver, headless, my_subjects, parse_html=False, persist=False, export_csv=False, history=False, log=print):
     # Start timing
-    print('\n=====================[ SCRAPING ]=====================')
+    log('\n=====================[ SCRAPING ]=====================')
     start_time = time.time()
 
-    slot_scraper = SlotScraper(driver=driver, headless=headless, my_subjects=my_subjects)
-    slot_scraper.get_page(testing=testing)
+    with trace('scrape', log=log):
+        slot_scraper = SlotScraper(driver=driver, headless=headless, my_subjects=my_subjects, log=log)
+        get_session(slot_scraper.driver, testing, persist=persist, log=log).open_choose_page()
 
-    if not testing:
-        slot_scraper.login()
-        slot_scraper.enroll()
-
-    # If testing, directly navigate to page
-    slot_scraper.check_tnc()
-    slot_scraper.scrape()
-    slot_scraper.export()
+        if parse_html:
+            slot_scraper.scrape_html()
+        else:
+            slot_scraper.expand()
+            slot_scraper.scrape()
+        data = slot_scraper.export(export_csv, history)
 
     # End timing
     end_time = time.time()  
-    print(f'\nTotal scraping time: {end_time - start_time:.2f}s')
-    print('======================================================\n')
+    log(f'\nTotal scraping time: {end_time - start_time:.2f}s')
+    log('======================================================\n')
+    return data
 
 if __name__ == '__main__':
     my_subjects = [
@@ -1,38 +1,64 @@
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
-from selenium import webdriver
-from pathlib import Path
-import keyring
+from driver_setup import init_driver
+from izone_session import get_session
+from izone_client import BASE_URL, TIMEOUT
+from waits import make_wait, expand_all
+from tracing import trace, span
 import time
 
+# Take the first schedule whose groups are all open, tick its radios and
+# submit the form, all in a single round trip
+SELECT_SCRIPT = '''
+const schedules = arguments[0];
+const form = document.forms['frmAddSubject'];
+const errors = [];
+for (let i = 0; i < schedules.length; i++) {
+    const radios = [];
+    let error = null;
+    for (const [name, value] of Object.entries(schedules[i])) {
+        const radio = form.querySelector(`input[type="radio"][name="${name}"][value="${value}"]`);
+        if (!radio) {
+            error = `Group not found: ${name} ${value}`;
+            break;
+        }
+        const full = document.getElementById('cap-full-' + radio.id);
+        if (full && full.style.display !== 'none') {
+            error = `Group full: ${radio.getAttribute('data-groupNo')} (${name})`;
+            break;
+        }
+        radios.push(radio);
+    }
+    if (error) {
+        errors.push(error);
+        continue;
+    }
+    for (const radio of radios) radio.checked = true;
+    document.getElementById('inp_confirm').value = '1';
+    form.querySelector('button[type="submit"]').click();
+    return [i, errors];
+}
+return [null, errors];
+'''
+
 class SlotSelector:
-    def __init__(self, driver, headless):
+    def __init__(self, driver, headless, log=print):
+        self.log = log
         if driver:
             self.driver = driver
         else:
             self.driver = self.init_driver(headless)
 
-        self.wait = WebDriverWait(self.driver, 2)
+        self.wait = make_wait(self.driver)
         self.my_subjects = []
         self.my_l_groups = []
         self.my_p_groups = []
         self.my_w_groups = []
+        self.full_groups = set()
 
     def init_driver(self, headless):
-        print('Setting up webdriver...')
-
-        options = Options()
-        if headless:
-            options.add_argument('--headless')
-
-        # Use Service with WebDriver Manager
-        service = Service(ChromeDriverManager().install())
-        return webdriver.Chrome(service=service, options=options)
+        return init_driver(headless, log=self.log)
     
     def init_groups(self, subjects, l_groups, p_groups, w_groups):
         self.my_subjects = subjects
@@ -40,49 +66,6 @@ class SlotSelector:
         self.my_p_groups = p_groups
         self.my_w_groups = w_groups
 
-    def get_page(self, testing):
-        print('Fetching page...')
-
-        if testing:
-            print()
-            self.driver.get(Path('test_html/3choose.html').resolve().as_uri())
-        else:
-            self.driver.get('https://izone.sunway.edu.my/login')
-    
-    def login(self):
-        print('Logging in...')
-
-        input_un = self.wait.until(EC.presence_of_element_located((By.ID, 'student_uid')))
-        input_pw = self.wait.until(EC.presence_of_element_located((By.ID, 'password')))
-        submit_btn = self.wait.until(EC.presence_of_element_located((By.ID, 'submit')))
-
-        input_un.send_keys(keyring.get_password('izone', 'username'))
-        input_pw.send_keys(keyring.get_password('izone', 'password'))
-        submit_btn.click()
-
-    def enroll(self):
-        print('Enrolling...')
-
-        while True:
-            try:
-                # Enroll btn
-                self.wait.until(
-                    EC.element_to_be_clickable((By.XPATH, '//div[@id="panel-dashboard-profile"]//a[@class="btn btn-default"]'))
-                ).click()
-                break
-
-            except TimeoutException:
-                # Reload
-                self.wait.until(
-                    EC.element_to_be_clickable((By.ID, 'reloadUrl'))
-                ).click()
-                print('Button not found. Refreshing...')
-    
-    def check_tnc(self):
-        self.wait.until(
-            EC.element_to_be_clickable((By.ID, 'chk_confirm'))
-        ).click()
-
     def select(self):
         subjects = self.wait.until(EC.presence_of_all_elements_located((By.CLASS_NAME, 'mySubject')))
         
@@ -92,20 +75,22 @@ class SlotSelector:
             # Check if its my subject
             index = self.get_subject_index(name)
             if index is not None:
-                print(f'Selecting slot for "{name}"...')
+                self.log(f'Selecting slot for "{name}"...')
 
-                # Expand dropdowns
-                self.expand_dd(subject)    
+                with span('select subject', subject=name):
+                    # Scrape lectures
+                    radios = subject.find_elements(By.CLASS_NAME, 'panel-body')
 
-                # Scrape lectures
-                radios = subject.find_elements(By.CLASS_NAME, 'panel-body')
-                
-                for i, radio in enumerate(radios): 
-                    # Determine group num
-                    group_num = self.get_group_num(i, index)
+                    for i, radio in enumerate(radios):
+                        # Determine group num
+                        group_num = self.get_group_num(i, index)
 
-                    # Click radio button
-                    self.click_radio_btn(radio, group_num)
+                        # Click radio button
+                        with span('click', group=group_num.strip()):
+                            clicked = self.click_radio_btn(radio, group_num)
+                        if clicked is False:
+                            self.full_groups.add((self.my_subjects[index], i, group_num))
+                            raise AssertionError(f'Group full:{group_num}({name})')
 
     def click_radio_btn(self, radio, group_num):
         groups = radio.find_elements(By.CLASS_NAME, 'radio')
@@ -113,15 +98,80 @@ class SlotSelector:
 
             if group_num in group.text:
                 if 'Temporarily Full' in group.text:
-                    print('Group full')
-                    raise AssertionError
+                    return False
 
                 # Click radio button
                 group.find_element(By.XPATH, './/label').click()
-                return
+                return True
+
+    def select_direct(self, ranked):
+        # ranked: {radio name: class ID} for every group, one per schedule, best first
+        self.log(f'Selecting from {len(ranked)} schedules directly...')
+        start = 0
+        while start < len(ranked):
+            # The script submits too, so this span covers the whole round trip
+            with span('select direct', schedules=len(ranked) - start):
+                form = self.driver.find_element(By.NAME, 'frmAddSubject')
+                index, errors = self.driver.execute_script(SELECT_SCRIPT, ranked[start:])
+                confirmed = index is not None and self.wait_for_preview(form)
+            for i, error in enumerate(errors, start):
+                self.log(f'Schedule {i + 1}: {error}')
+            if index is None:
+                break
+            if confirmed:
+                return start + index
+
+            # Back on the choose page, try the rest against the groups it shows now
+            self.log(f'Schedule {start + index + 1}: not confirmed, the choose page came back')
+            start += index + 1
+        raise AssertionError(f'None of the {len(ranked)} schedules could be selected')
+
+    def wait_for_preview(self, form):
+        # Only the preview page means the selection went through. A slow answer under load
+        # may still have been taken, so no other schedule is tried after a timeout
+        wait = make_wait(self.driver, timeout=TIMEOUT)
+        try:
+            wait.until(EC.staleness_of(form))
+            wait.until(EC.any_of(
+                EC.presence_of_element_located((By.NAME, 'frmSubjectPreview')),
+                EC.presence_of_element_located((By.CLASS_NAME, 'mySubject')),
+            ))
+        except TimeoutException:
+            raise AssertionError(f'Submission unconfirmed after {TIMEOUT}s ({self.driver.current_url}), '
+                                 'check the choose page before selecting again')
+        return bool(self.driver.find_elements(By.NAME, 'frmSubjectPreview'))
+
+    def expand(self):
+        # Every dropdown in one call, collapsed radios can't be clicked
+        with span('expand'):
+            self.wait.until(EC.presence_of_all_elements_located((By.CLASS_NAME, 'mySubject')))
+            expand_all(self.driver)
+
+    def select_ranked(self, schedules):
+        # Click through the schedules in order on the same page, skipping
+        # any that use a group already seen full
+        for i, schedule in enumerate(schedules):
+            if get_schedule_groups(schedule) & self.full_groups:
+                continue
+
+            self.init_groups(schedule['subjects'], schedule['l_groups'], schedule['p_groups'], schedule['w_groups'])
+            try:
+                self.select()
+            except AssertionError as e:
+                self.log(f'Schedule {i + 1}: {e}')
+                continue
+
+            if self.submit():
+                return i
+            self.log(f'Schedule {i + 1}: not confirmed, the choose page came back')
+            self.expand()
+        raise AssertionError(f'None of the {len(schedules)} schedules could be selected')
 
     def submit(self):
-        self.driver.find_element(By.XPATH, '//button[@type="submit"]').click()
+        with span('submit'):
+            form = self.driver.find_element(By.NAME, 'frmAddSubject')
+            self.driver.find_element(By.XPATH, '//button[@type="submit"]').click()
+            return self.wait_for_preview(form)
 
     # Helper Functions
     def get_subject_index(self, name):
@@ -130,17 +180,6 @@ class SlotSelector:
                 return i
         return None
     
-    def expand_dd(self, subject):
-        panel_groups = subject.find_elements(By.CLASS_NAME, 'panel-group')
-        for panel_group in panel_groups:
-            
-            # Try expand dropdown
-            try:
-                panel_group.find_element(By.XPATH, './/span[contains(@class, "glyphicon-chevron-down")]').click()
-                time.sleep(0.2)
-            except NoSuchElementException:
-                pass
-
     def get_group_num(self, i, index):
         if i == 0:
             group_num = self.my_l_groups[index]
@@ -150,50 +189,71 @@ class SlotSelector:
             group_num = self.my_w_groups[index]
         return group_num
 
-def select_slot(driver, testing, headless, subjects, l_groups, p_groups, w_groups):
-    # subjects = ['information systems analysis & design', 'operating system fundamentals', 'web fundamentals']
-    # l_groups = [' 1 ', ' 1 ', '1']
-    # p_groups = [' 2 ', ' 3 ', ' 10 ']
-    # w_groups = ['  ', '  ', '  ']
+def get_schedule_groups(schedule):
+    groups = set()
+    for i, subject in enumerate(schedule['subjects']):
+        for j, group_nums in enumerate([schedule['l_groups'], schedule['p_groups'], schedule['w_groups']]):
+            groups.add((subject, j, group_nums[i]))
+    return groups
+
+def manual_hint(headless, logged_in):
+    # The Chrome window only helps if it is visible and got as far as the choose page
+    if headless or not logged_in:
+        return f'Select the rest manually: log in at {BASE_URL} in your own browser'
+    return 'Continue manually in the Chrome window, it is already logged in'
+
+def select_slot(driver, testing, headless, schedules, persist=False, log=print):
+    # schedules: best first, each with the radios to post (choices) and the group numbers to click
+    # {
+    #     'choices': {'ITMS0000489L': '706264', 'ITMS0000489T': '706272'},
+    #     'subjects': ['information systems analysis & design', 'operating system fundamentals', 'web fundamentals'],
+    #     'l_groups': [' 1 ', ' 1 ', ' 1 '],
+    #     'p_groups': [' 2 ', ' 3 ', ' 10 '],
+    #     'w_groups': ['  ', '  ', '  ']
+    # }
 
     # Start timing
-    print('\n=====================[ SELECTING ]=====================')
+    log('\n=====================[ SELECTING ]=====================')
     start_time = time.time()
 
-    slot_selector = SlotSelector(driver=driver, headless=headless)
-    slot_selector.init_groups(subjects, l_groups, p_groups, w_groups)
-    slot_selector.get_page(testing=testing)
-
-    try:
-        if not testing:
-            slot_selector.login()
-            slot_selector.enroll()
-
-        # If testing, directly navigate to page
-        slot_selector.check_tnc()
-
-        # Select
-        slot_selector.select()
-        slot_selector.submit()
-    except Exception as e:
-        print(e)
-        input('Error encountered. Continue manually: ')
+    with trace('select', log=log):
+        slot_selector = SlotSelector(driver=driver, headless=headless, log=log)
+        session = get_session(slot_selector.driver, testing, persist=persist, log=log)
+
+        try:
+            session.open_choose_page()
+
+            # Select
+            if all(schedule['choices'] for schedule in schedules):
+                index = slot_selector.select_direct([schedule['choices'] for schedule in schedules])
+            else:
+                slot_selector.expand()
+                index = slot_selector.select_ranked(schedules)
+            log(f'Selected schedule {index + 1}')
+        except Exception as e:
+            log(str(e))
+            log(manual_hint(headless, session.choose_url))
+            raise
 
     # End timing
     end_time = time.time()  
-    print(f'\nTotal select time: {end_time - start_time:.2f}s')
-    print('======================================================\n')
+    log(f'\nTotal select time: {end_time - start_time:.2f}s')
+    log('======================================================\n')
+    return index
 
 if __name__ == '__main__':
     select_slot(
         driver=None,
         testing=True,
         headless=False,
-        subjects = ['information systems analysis & design', 'operating system fundamentals', 'web fundamentals'],
-        l_groups=[' 1 ', ' 1 ', ' 1 '],
-        p_groups=[' 2 ', ' 3 ', ' 10 '],
-        w_groups=['  ', '  ', '  ']
+        schedules=[{
+            'choices': {},
+            'subjects': ['information systems analysis & design', 'operating system fundamentals', 'web fundamentals'],
+            'l_groups': [' 1 ', ' 1 ', ' 1 '],
+            'p_groups': [' 2 ', ' 3 ', ' 10 '],
+            'w_groups': ['  ', '  ', '  ']
+        }]
     )
 
     # Prompt exit
-    input('Exit: ')
\ No newline at end of file
+    input('Exit: ')
@@ -0,0 +1,343 @@
+from class_slot import ClassType, register, get_slots
+from heapq import heappush, heapreplace
+from collections import defaultdict
+from itertools import product
+
+DAYS = ["MON", "TUE", "WED", "THU", "FRI", "SAT", "SUN"]
+
+# Each class is compiled into one int covering the whole week,
+# one bit per 5 minutes, so a clash is just a bitwise AND
+SLOT_MINUTES = 5
+DAY_SLOTS = 24 * 60 // SLOT_MINUTES
+DAY_MASK = (1 << DAY_SLOTS) - 1
+LONG_GAP_MINUTES = 240
+LONG_GAP_SLOTS = LONG_GAP_MINUTES // SLOT_MINUTES
+
+# The default score, lower ranks first. ScheduleTable and scoring.py start from the same weights
+SCORE_WEIGHTS = {
+    'gap_minutes': 1,         # per free minute between classes on the same day
+    'single_class_day': 40,   # per day with only one class
+    'long_gap': 100,          # per gap of LONG_GAP_MINUTES or more
+    'day_off': -20,           # per weekday without classes
+}
+
+# Default number of best schedules kept by rank_schedules
+TOP_K = 300
+
+# Helper functions
+def time_to_tuple(cls):
+    h1, m1 = map(int, cls["Start Time"].split(":"))
+    h2, m2 = map(int, cls["End Time"].split(":"))
+    return h1 * 60 + m1, h2 * 60 + m2
+
+def compile_class(cls):
+    # Cached records already carry the parsed day and times
+    if "start" not in cls:
+        cls["start"], cls["end"] = time_to_tuple(cls)
+        cls["day_idx"] = DAYS.index(cls["Day"])
+    first = cls["start"] // SLOT_MINUTES
+    last = -(-cls["end"] // SLOT_MINUTES)
+
+    mask = ((1 << (last - first)) - 1) << (cls["day_idx"] * DAY_SLOTS + first)
+    return register(cls, mask)
+
+def compile_classes(records):
+    return [compile_class(cls) for cls in records]
+
+# Create subject-wise triplets (lecture, practical, workshop)
+def build_subject_combinations(records):
+    # Records are compiled to ClassSlots with bitmasks once here and reused everywhere
+    compiled = compile_classes(records)
+    groups = defaultdict(lambda: defaultdict(list))
+    for cls in compiled:
+        groups[cls.subject][cls.class_type].append(cls)
+
+    subject_combinations = {}
+    for subject in dict.fromkeys(cls.subject for cls in compiled if cls.class_type == ClassType.LECTURE):
+        types = groups[subject]
+        lec = types[ClassType.LECTURE]
+        prac = types.get(ClassType.PRACTICAL, [None])
+        work = types.get(ClassType.WORKSHOP, [None])
+        subject_combinations[subject] = list(product(lec, prac, work))
+    return subject_combinations
+
+def has_overlap(classes):
+    mask = 0
+    for cls in classes:
+        if not cls: continue
+        if mask & cls.mask:
+            return True
+        mask |= cls.mask
+    return False
+
+def gap_mask(day_mask):
+    # Free slots between the first and last class of the day
+    low = day_mask & -day_mask
+    return ((1 << day_mask.bit_length()) - low) & ~day_mask
+
+def count_long_gaps(gaps):
+    if gaps.bit_count() < LONG_GAP_SLOTS:
+        return 0
+
+    # Keep bits that start a run of >= LONG_GAP_SLOTS free slots
+    runs, length = gaps, 1
+    while length < LONG_GAP_SLOTS:
+        step = min(length, LONG_GAP_SLOTS - length)
+        runs &= runs >> step
+        length += step
+    return (runs & ~(runs << 1)).bit_count()
+
+def day_stats(classes):
+    # (number of classes, gap mask) for every school day
+    mask = 0
+    counts = [0] * len(DAYS)
+    for cls in classes:
+        if not cls: continue
+        mask |= cls.mask
+        counts[cls.day_idx] += 1
+
+    stats = []
+    for day, count in enumerate(counts):
+        if count:
+            stats.append((count, gap_mask((mask >> (day * DAY_SLOTS)) & DAY_MASK)))
+    return stats
+
+def score_schedule(classes):
+    total_gap = 0
+    single_days = 0
+    school_days = 0
+    long_gaps = 0
+
+    for count, gaps in day_stats(classes):
+        if count == 1:
+            single_days += 1
+        school_days += 1
+        total_gap += gaps.bit_count() * SLOT_MINUTES
+        long_gaps += count_long_gaps(gaps)
+
+    w = SCORE_WEIGHTS
+    return (w['gap_minutes'] * total_gap + w['single_class_day'] * single_days
+            + w['long_gap'] * long_gaps + w['day_off'] * (5 - school_days))
+
+def day_gap_bound(day_mask, day_reachable):
+    # (free slots, long gaps) the day keeps whatever is added. Two long runs may
+    # still end up in one gap, so a day counts at most one
+    gaps = gap_mask(day_mask) & ~day_reachable
+    return gaps.bit_count(), count_long_gaps(gaps) > 0
+
+def score_lower_bound(day_masks, reachable, days, singles=0, cache=None):
+    # day_masks: each day's classes chosen so far, reachable: slots the subjects left could fill,
+    # days: days every completion has classes on (the chosen ones plus days some subject
+    # can't avoid), singles: days with one class chosen so far.
+    # cache: day_gap_bound results, sibling schedules share most of their days
+    if cache is None:
+        cache = {}
+    gap = 0
+    long_gaps = 0
+    single_days = 0
+    for day, day_mask in enumerate(day_masks):
+        if day_mask:
+            day_reachable = reachable and (reachable >> (day * DAY_SLOTS)) & DAY_MASK
+            key = (day_mask, day_reachable) if day_reachable else day_mask
+            result = cache.get(key)
+            if result is None:
+                result = cache[key] = day_gap_bound(day_mask, day_reachable)
+            gap += result[0]
+            long_gaps += result[1]
+            # Nothing left can join a lone class on a day no subject can reach
+            if not day_reachable and singles >> day & 1:
+                single_days += 1
+    w = SCORE_WEIGHTS
+    return (w['gap_minutes'] * gap * SLOT_MINUTES + w['single_class_day'] * single_days
+            + w['long_gap'] * long_gaps + w['day_off'] * (5 - days.bit_count()))
+
+def filter_schedules(schedules, f1, f2, f3, f4, f5, f6):
+    filtered = []
+    for score, combo in schedules:
+        stats = day_stats(get_slots(combo))
+        days = len(stats)
+        if f1 and days != 4:
+            continue
+        if f2 and days != 3:
+            continue
+        if f3 and days != 2:
+            continue
+        large_gap_days = sum(1 for _, gaps in stats if count_long_gaps(gaps))
+        if f4 and large_gap_days:
+            continue
+        if f5 and large_gap_days > 1:
+            continue
+        if f6 and any(count == 1 for count, _ in stats):
+            continue
+        filtered.append((score, combo))
+    return filtered
+
+# Solver
+def class_days(classes):
+    # (days with classes, days with more than one) as bits, and each day's slots on their own
+    days = 0
+    busy = 0
+    parts = {}
+    for cls in classes:
+        busy |= days & 1 << cls.day_idx
+        days |= 1 << cls.day_idx
+        parts[cls.day_idx] = parts.get(cls.day_idx, 0) | cls.mask >> (cls.day_idx * DAY_SLOTS)
+    return days, busy, tuple(parts.items())
+
+def make_domain(options):
+    # (options, every slot they could fill, days all of them have classes on)
+    reachable = 0
+    forced = -1
+    for option in options:
+        reachable |= option[2]
+        forced &= option[3]
+    return options, reachable, forced
+
+def solve_schedules(subject_combinations, prune=None):
+    # Compile every (lecture, practical, workshop) triple into one mask
+    domains = []
+    for i, triples in enumerate(subject_combinations.values()):
+        options = []
+        for triple in triples:
+            classes = [c for c in triple if c]
+            if has_overlap(classes):
+                continue
+            mask = 0
+            for cls in classes:
+                mask |= cls.mask
+            options.append((i, classes, mask, *class_days(classes)))
+        domains.append(make_domain(options))
+
+    chosen = {}
+
+    def backtrack(domains, day_masks, days, busy):
+        if not domains:
+            # Keep subject order stable regardless of assignment order
+            yield [c for i in sorted(chosen) for c in chosen[i]]
+            return
+
+        # Assign the most constrained subject first
+        pick = min(range(len(domains)), key=lambda j: len(domains[j][0]))
+        rest = domains[:pick] + domains[pick + 1:]
+
+        for i, classes, option_mask, option_days, option_busy, parts in domains[pick][0]:
+            # Forward check: drop triples that clash with this one, the reachable slots
+            # and forced days only need working out again for subjects that lost some
+            pruned = []
+            reachable = 0
+            forced = days | option_days
+            for domain in rest:
+                options = domain[0]
+                kept = [o for o in options if not o[2] & option_mask]
+                if not kept:
+                    break
+                if len(kept) < len(options):
+                    domain = make_domain(kept)
+                pruned.append(domain)
+                reachable |= domain[1]
+                forced |= domain[2]
+            else:
+                # Each day on its own and which days have one class, for the bound
+                child_masks = list(day_masks)
+                for day, day_mask in parts:
+                    child_masks[day] |= day_mask
+                child_days = days | option_days
+                child_busy = busy | option_busy | (days & option_days)
+
+                # Branch and bound: let the caller skip hopeless subtrees
+                if prune and prune(child_masks, reachable, forced, child_days & ~child_busy):
+                    continue
+                chosen[i] = classes
+                yield from backtrack(pruned, child_masks, child_days, child_busy)
+                del chosen[i]
+
+    yield from backtrack(domains, [0] * len(DAYS), 0, 0)
+
+def rank_schedules(subject_combinations, k=TOP_K, bound=True, seed=(), cancelled=None):
+    # Max-heap of the k lowest scores seen so far (ties keep the earlier one)
+    heap = []
+    seen = set()
+
+    def push(score, count, classes):
+        entry = (-score, -count, classes)
+        if len(heap) < k:
+            heappush(heap, entry)
+        elif score < -heap[0][0]:
+            heapreplace(heap, entry)
+
+    # Already ranked schedules only need to be skipped when solved again
+    for count, (score, ids) in enumerate(seed):
+        seen.add(schedule_key(ids))
+        push(score, count - len(seed), ids)
+
+    cache = {}
+
+    def prune(day_masks, reachable, days, singles):
+        # Cancelling prunes everything that is left
+        if cancelled and cancelled():
+            return True
+        return bound and len(heap) == k and score_lower_bound(day_masks, reachable, days, singles, cache) >= -heap[0][0]
+
+    schedules = solve_schedules(subject_combinations, prune if bound or cancelled else None)
+    for count, classes in enumerate(schedules):
+        # Schedules are kept as tuples of slot IDs
+        ids = tuple(cls.id for cls in classes)
+        if seen and schedule_key(ids) in seen:
+            continue
+        push(score_schedule(classes), count, ids)
+
+    heap.sort(reverse=True)
+    return [(-score, ids) for score, _, ids in heap]
+
+# Incremental re-solve
+def schedule_key(ids):
+    return frozenset(ids)
+
+def slot_index(subject_combinations):
+    return {
+        cls.id: cls
+        for triples in subject_combinations.values()
+        for triple in triples
+        for cls in triple if cls
+    }
+
+def class_layout(subject_combinations):
+    # Which class types each subject has (every triple shares them)
+    return {
+        subject: tuple(cls.class_type if cls else None for cls in triples[0]) if triples else ()
+        for subject, triples in subject_combinations.items()
+    }
+
+def restrict_combinations(subject_combinations, required, excluded):
+    restricted = {}
+    for subject, triples in subject_combinations.items():
+        kept = [t for t in triples if not any(cls and cls.id in excluded for cls in t)]
+        if any(cls and cls.id == required for triple in triples for cls in triple):
+            kept = [t for t in kept if any(cls and cls.id == required for cls in t)]
+        restricted[subject] = kept
+    return restricted
+
+def rerank_schedules(ranked, old_combinations, new_combinations, k=TOP_K, cancelled=None):
+    # New subjects or class types change every schedule, so solve from scratch.
+    # So does an empty ranking, there is nothing to carry over
+    if not ranked or class_layout(old_combinations) != class_layout(new_combinations):
+        return rank_schedules(new_combinations, k, cancelled=cancelled)
+
+    # Slot IDs are stable across refreshes, so ranked schedules carry over as they are
+    old_slots = slot_index(old_combinations)
+    new_slots = slot_index(new_combinations)
+    removed = old_slots.keys() - new_slots.keys()
+    added = [slot_id for slot_id in new_slots if slot_id not in old_slots]
+
+    # Drop schedules using groups that are gone
+    kept = [(score, ids) for score, ids in ranked if removed.isdisjoint(ids)]
+
+    # Schedules past the old cut-off may move up, so search again with a tight bound
+    if removed and len(ranked) >= k:
+        return rank_schedules(new_combinations, k, seed=kept, cancelled=cancelled)
+
+    # Only solve for schedules that use at least one newly opened group
+    for i, slot_id in enumerate(added):
+        restricted = restrict_combinations(new_combinations, slot_id, set(added[:i]))
+        kept = rank_schedules(restricted, k, seed=kept, cancelled=cancelled)
+    return kept[:k]
@@ -0,0 +1,138 @@
+from slot_solver import build_subject_combinations, rank_schedules, TOP_K
+from schedule_table import ScheduleTable
+from izone_client import get_session
+from slot_cache import prepare_records
+from slot_history import record_snapshot
+from class_slot import get_slots
+import time
+
+class SlotWatcher:
+    def __init__(self, client, schedules, history=False, log=print):
+        self.client = client
+        self.history = history
+        self.log = log
+
+        # Radio name -> class ID for each watched schedule, best first
+        self.targets = [get_choices(classes) for classes in schedules]
+        self.markers = {cap_full_id(cls.radio_name, cls.class_id): cls for classes in schedules for cls in classes}
+
+    def full_groups(self, page_source):
+        # Only read the cap-full markers we care about instead of parsing the whole page
+        full = set()
+        for marker in self.markers:
+            start = page_source.find(f'id="{marker}"')
+            if start == -1:
+                # Group is gone, treat it like a full one
+                full.add(marker)
+                continue
+
+            style = page_source[start:page_source.find('>', start)].replace(' ', '')
+            if 'display:none' not in style:
+                full.add(marker)
+        return full
+
+    def find_open(self, full):
+        for rank, choices in enumerate(self.targets):
+            if not any(cap_full_id(name, value) in full for name, value in choices.items()):
+                return rank, choices
+        return None, None
+
+    def watch(self, interval=1.0, max_polls=None, cancelled=None):
+        polls = 0
+        while max_polls is None or polls < max_polls:
+            if cancelled and cancelled():
+                return None
+
+            # Poll
+            start_time = time.perf_counter()
+            self.client.refresh()
+            fetch_time = time.perf_counter()
+            full = self.full_groups(self.client.page_source)
+            rank, choices = self.find_open(full)
+            check_time = time.perf_counter()
+            polls += 1
+
+            # Submit as soon as a watched schedule opens up, logging and history wait until after
+            error = None
+            if choices:
+                try:
+                    self.client.submit_selection(choices)
+                except AssertionError as e:
+                    # Taken again before the submit landed, keep watching
+                    error = e
+                submit_time = time.perf_counter()
+
+            self.log(f'Poll {polls}: {len(full)}/{len(self.markers)} watched groups full '
+                     f'(fetch {(fetch_time - start_time) * 1000:.0f}ms, check {(check_time - fetch_time) * 1000:.2f}ms)')
+            if self.history:
+                rows = [cls.record() | {'Full': marker in full} for marker, cls in self.markers.items()]
+                record_snapshot(rows, source='watch', log=lambda msg: None)
+
+            if error:
+                self.log(f'Schedule {rank + 1} opened but was not selected: {error}')
+            elif choices:
+                self.log(f'Schedule {rank + 1} opened, selected')
+                self.log(f'Detect to submit: {(submit_time - fetch_time) * 1000:.0f}ms')
+                return choices
+
+            # Wait out the rest of the interval
+            while time.perf_counter() - start_time < interval:
+                if cancelled and cancelled():
+                    return None
+                time.sleep(min(0.1, interval))
+
+        self.log(f'Nothing opened after {polls} polls')
+        return None
+
+# Helper Functions
+def cap_full_id(name, value):
+    # <p id="cap-full-DACC006L-718028"> sits next to radio DACC006L value 718028
+    return f'cap-full-{name}-{value}'
+
+def get_choices(classes):
+    return {cls.radio_name: cls.class_id for cls in classes}
+
+def get_targets(records, top=20, filters=(False,) * 6, scorer=None, log=print):
+    # Rank with the full groups included and keep the ones better than
+    # the best schedule that can be selected right now. Scored and filtered
+    # like the GUI, so a schedule the user filtered out is never submitted
+    records = prepare_records(records, log=log)
+    ranked = rank_schedules(build_subject_combinations(records), max(TOP_K, top))
+    table = ScheduleTable([ids for _, ids in ranked], scorer)
+
+    targets = []
+    for _, ids in table.filter(*filters)[:top]:
+        classes = get_slots(ids)
+        if not any(cls.full for cls in classes):
+            break
+        targets.append(classes)
+    return targets
+
+def start_watch(testing, my_subjects, interval=1.0, top=20, filters=(False,) * 6, scorer=None, max_polls=None, cancelled=None,
+                persist=False, history=False, log=print):
+    log('\n=====================[ WATCHING ]=====================')
+
+    client = get_session(testing, persist=persist, cancelled=cancelled, log=log)
+
+    rows = client.scrape(my_subjects, include_full=True)
+    if history:
+        record_snapshot(rows, log=log)
+
+    targets = get_targets(rows, top, filters, scorer, log=log)
+    if not targets:
+        log('Best schedule is already open, nothing to watch')
+        return None
+
+    watcher = SlotWatcher(client, targets, history=history, log=log)
+    log(f'Watching {len(watcher.markers)} groups across {len(targets)} schedules every {interval}s')
+    choices = watcher.watch(interval=interval, max_polls=max_polls, cancelled=cancelled)
+    log('======================================================\n')
+    return choices
+
+if __name__ == '__main__':
+    my_subjects = [
+        'web fundamentals',
+        'operating system fundamentals',
+        'information systems analysis & design'
+    ]
+    start_watch(testing=True, my_subjects=my_subjects, max_polls=5)
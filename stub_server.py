@@ -0,0 +1,59 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+from pathlib import Path
+import threading
+
+# Offline stand-in for izone that serves the pages in test_html/
+# GET  /login                        -> login page
+# POST with student_uid              -> home page (dashboard), the login page again unless the password is "test"
+# POST with enrolment_ref_id         -> redirect to /enrolment/
+# GET  /enrolment/                   -> choose page
+# POST with btn_edit                 -> choose page
+# POST with frmAddSubjectAction      -> enrolled page
+html_dir = Path(__file__).resolve().parent / 'test_html'
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_page('3choose.html' if self.path.startswith('/enrolment/') else '1login.html')
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        fields = parse_qs(self.rfile.read(length).decode())
+
+        if 'student_uid' in fields:
+            self.send_page('2home.html' if fields.get('password') == ['test'] else '1login.html')
+        elif 'enrolment_ref_id' in fields:
+            self.send_response(303)
+            self.send_header('Location', '/enrolment/?page=subjects')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        elif 'frmAddSubjectAction' in fields:
+            self.server.submissions.append(fields)
+            self.send_page('if_chosen.html')
+        else:
+            self.send_page('3choose.html')
+
+    def send_page(self, name):
+        body = (html_dir / name).read_bytes()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+server = None
+
+def start_stub_server(port=0):
+    global server
+    if server is None:
+        server = ThreadingHTTPServer(('127.0.0.1', port), StubHandler)
+        server.submissions = []
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{server.server_port}'
+
+if __name__ == '__main__':
+    print(f'Serving test_html at {start_stub_server(8000)}')
+    input('Exit: ')
@@ -0,0 +1,37 @@
+from slot_parser import parse_slots, export_slots
+from pathlib import Path
+from cli import main
+import json
+
+html_path = Path(__file__).resolve().parent / 'test_html' / '3choose.html'
+quiet = lambda *_: None
+
+def test_html_to_json(capsys):
+    assert main(['--html', str(html_path), '--subjects', 'web fundamentals', '--top', '2']) == 0
+    out = json.loads(capsys.readouterr().out)
+    assert [schedule['rank'] for schedule in out] == [1, 2]
+    assert {cls['Subject'] for cls in out[0]['classes']} == {'WEB1201 - Web Fundamentals'}
+
+def test_csv_log_stays_off_stdout(tmp_path, capsys):
+    # The economics workshop has no period yet, skipping it is logged to stderr only
+    rows = parse_slots(html_path.read_text(encoding='utf-8'), ['web fundamentals', 'fundamentals of economics'],
+                       include_full=True, log=quiet)
+    path = tmp_path / 'slots.csv'
+    export_slots(rows, path=path, log=quiet)
+
+    assert main(['--slots', str(path), '--subjects', 'web fundamentals', 'economics']) == 0
+    captured = capsys.readouterr()
+    assert json.loads(captured.out)
+    assert 'Skipping' in captured.err
+
+def test_missing_slots_file(tmp_path, capsys):
+    assert main(['--slots', str(tmp_path / 'missing.csv'), '--subjects', 'web']) == 1
+    captured = capsys.readouterr()
+    assert captured.out == ''
+    assert 'missing.csv' in captured.err
+
+def test_bad_scoring_spec(tmp_path, capsys):
+    spec = tmp_path / 'scoring.toml'
+    spec.write_text('[weights]\ngaps = 1\n', encoding='utf-8')
+    assert main(['--html', str(html_path), '--subjects', 'web', '--scoring', str(spec)]) == 1
+    assert 'Unknown scoring keys' in capsys.readouterr().err
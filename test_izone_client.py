@@ -0,0 +1,66 @@
+from izone_client import IzoneClient
+from stub_server import start_stub_server
+import stub_server
+import requests
+from worker import Cancelled
+import pytest
+
+quiet = lambda *_: None
+
+@pytest.fixture
+def client():
+    # A fresh session against the offline stand-in for izone
+    return IzoneClient(base_url=start_stub_server(), log=quiet)
+
+def test_wrong_password(client):
+    with pytest.raises(AssertionError, match='Login failed'):
+        client.open('test', 'wrong')
+
+def test_cancel_while_waiting_to_enroll(client):
+    # The login page has no Enroll button, so this would refresh forever
+    page = client.session.get(f'{client.base_url}/login')
+    client.cancelled = lambda: True
+    with pytest.raises(Cancelled):
+        client.enroll(page)
+
+def test_scrape_and_select(client):
+    # Login, enroll and the choose page, then one POST with the chosen radios
+    client.open('test', 'test')
+    rows = client.scrape(['web fundamentals'], include_full=True)
+    groups = {(row['Class Type'], row['Group Number']): row for row in rows}
+    choice = lambda *key: {groups[key]['Radio Name']: groups[key]['Class ID']}
+
+    lecture = choice('Lecture', 'Group 1')
+    full = lecture | choice('Practical', 'Group 2')
+    open_group = lecture | choice('Practical', 'Group 8')
+    assert groups[('Practical', 'Group 2')]['Full']
+
+    submissions = stub_server.server.submissions
+    sent = len(submissions)
+    # The full group is skipped without posting, the next schedule goes through
+    assert client.select_schedules([full, open_group]) == 1
+    assert len(submissions) == sent + 1
+
+    fields = submissions[-1]
+    assert fields['inp_confirm'] == ['1']
+    for name, value in open_group.items():
+        assert fields[name] == [value]
+
+def test_select_all_full(client):
+    client.open('test', 'test')
+    rows = client.scrape(['web fundamentals'], include_full=True)
+    full = [{row['Radio Name']: row['Class ID']} for row in rows if row['Full']]
+    with pytest.raises(AssertionError, match='None of the'):
+        client.select_schedules(full)
+
+def test_submit_timeout_is_unconfirmed(client, monkeypatch):
+    # The POST may have been taken, so the next schedule must not be tried
+    client.open('test', 'test')
+    rows = client.scrape(['web fundamentals'])
+    ranked = [{row['Radio Name']: row['Class ID']} for row in rows]
+
+    def hang(*args, **kwargs):
+        raise requests.Timeout()
+    monkeypatch.setattr(client.session, 'post', hang)
+    with pytest.raises(AssertionError, match='unconfirmed'):
+        client.select_schedules(ranked)
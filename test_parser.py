@@ -0,0 +1,59 @@
+from slot_parser import parse_slots, export_slots
+from slot_cache import prepare_records
+from pathlib import Path
+import pytest
+
+html_path = Path(__file__).resolve().parent / 'test_html' / '3choose.html'
+quiet = lambda *_: None
+
+MY_SUBJECTS = ['web fundamentals', 'operating system fundamentals', 'information systems analysis & design']
+
+@pytest.fixture(scope='module')
+def page_source():
+    return html_path.read_text(encoding='utf-8')
+
+def test_parse_my_subjects(page_source):
+    rows = parse_slots(page_source, MY_SUBJECTS, log=quiet)
+    assert len(rows) == 12
+    assert rows[0] == {
+        'Subject': 'BIS2102 - Information Systems Analysis & Design', 'Class Type': 'Lecture',
+        'Radio Name': 'ITMS0000489L', 'Class ID': '706264', 'Group Number': 'Group 1',
+        'Teacher': 'Assoc. Prof. Ts. Dr Aslina Baharum', 'Day': 'FRI', 'Start Time': '08:00', 'End Time': '10:00',
+    }
+    for subject in ['WEB1201 - Web Fundamentals', 'OSS1014 - Operating System Fundamentals',
+                    'BIS2102 - Information Systems Analysis & Design']:
+        types = [row['Class Type'] for row in rows if row['Subject'] == subject]
+        assert sorted(types) == ['Lecture', 'Practical', 'Practical', 'Practical']
+
+def test_parse_full_groups(page_source):
+    rows = parse_slots(page_source, ['web fundamentals'], include_full=True, log=quiet)
+    assert [(row['Group Number'], row['Full']) for row in rows if row['Class Type'] == 'Practical'] == [
+        ('Group 2', True), ('Group 6', True), ('Group 8', False), ('Group 9', True),
+        ('Group 10', False), ('Group 11', True), ('Group 12', False),
+    ]
+    assert rows[3] == {
+        'Subject': 'WEB1201 - Web Fundamentals', 'Class Type': 'Practical', 'Full': False,
+        'Radio Name': 'ITMS0000487P', 'Class ID': '706172', 'Group Number': 'Group 8',
+        'Teacher': '-', 'Day': 'TUE', 'Start Time': '16:00', 'End Time': '18:00',
+    }
+    # Only the open groups are kept by default
+    open_rows = parse_slots(page_source, ['web fundamentals'], log=quiet)
+    assert [row['Class ID'] for row in open_rows] == [row['Class ID'] for row in rows if not row['Full']]
+
+def test_parse_unknown_subject(page_source):
+    assert parse_slots(page_source, ['no such subject'], log=quiet) == []
+
+def test_export_error_does_not_block(page_source, tmp_path):
+    # Runs on the worker thread, a failed export is reported instead of prompting
+    rows = parse_slots(page_source, MY_SUBJECTS, log=quiet)
+    assert export_slots(rows, path=tmp_path / 'slots.csv', log=quiet)
+    assert not export_slots(rows, path=tmp_path / 'missing' / 'slots.csv', log=quiet)
+
+def test_parse_workers_agree(page_source):
+    assert parse_slots(page_source, [''], workers=1, log=quiet) == parse_slots(page_source, [''], workers=4, log=quiet)
+
+def test_groups_without_period_are_dropped(page_source):
+    rows = parse_slots(page_source, ['fundamentals of economics'], include_full=True, log=quiet)
+    assert any(row['Day'] == '' for row in rows)
+    prepared = prepare_records(rows, log=quiet)
+    assert prepared and all(row['Day'] for row in prepared)
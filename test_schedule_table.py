@@ -0,0 +1,49 @@
+from slot_solver import build_subject_combinations, rank_schedules, filter_schedules, score_schedule, day_stats, count_long_gaps
+from schedule_table import ScheduleTable
+from slot_parser import parse_slots
+from slot_cache import prepare_records
+from class_slot import get_slots
+from benchmark import make_page
+from itertools import product
+import random
+import pytest
+
+quiet = lambda *_: None
+
+# Few subjects so every day count and gap filter keeps some schedules and drops others
+PAGES = [(2, 4, 0), (2, 4, 1), (3, 4, 0), (5, 3, 1)]
+FLAGS = list(product([False, True], repeat=6))
+
+def make_ranked(n_subjects, n_groups, seed):
+    records = prepare_records(parse_slots(make_page(n_subjects, n_groups, seed), [''], log=quiet), log=quiet)
+    return rank_schedules(build_subject_combinations(records), 2000)
+
+@pytest.mark.parametrize('page', PAGES)
+def test_filter_index_matches_filter_schedules(page):
+    table = ScheduleTable([ids for _, ids in make_ranked(*page)])
+    expected = {flags: filter_schedules(table.schedules, *flags) for flags in FLAGS}
+
+    # Every combination of checkboxes, in a random order so cached ones are asked for again
+    order = FLAGS * 2
+    random.Random(0).shuffle(order)
+    for flags in order:
+        view = table.filter(*flags)
+        assert view[:] == expected[flags]
+        assert [view[i] for i in range(len(view))] == expected[flags]
+    assert len(table.filter_cache) == len(FLAGS)
+
+@pytest.mark.parametrize('page', PAGES)
+def test_features_match_score_schedule(page):
+    ranked = make_ranked(*page)
+    table = ScheduleTable([ids for _, ids in ranked])
+    # The vectorized score keeps the solver's ranking
+    assert table.schedules == ranked
+
+    for row, (score, ids) in enumerate(table.schedules):
+        classes = get_slots(ids)
+        stats = day_stats(classes)
+        assert table.base_score[row] == score_schedule(classes) == score
+        assert table.school_days[row] == len(stats)
+        assert table.single_days[row] == sum(count == 1 for count, _ in stats)
+        assert table.long_gaps[row] == sum(count_long_gaps(gaps) for _, gaps in stats)
+        assert table.large_gap_days[row] == sum(1 for _, gaps in stats if count_long_gaps(gaps))
@@ -0,0 +1,94 @@
+from slot_solver import build_subject_combinations, rank_schedules, DAYS
+from scoring import Scorer, load_spec
+from schedule_table import ScheduleTable
+from slot_parser import parse_slots
+from slot_cache import prepare_records
+from class_slot import get_slots
+from benchmark import make_page
+from pathlib import Path
+import json
+import pytest
+
+quiet = lambda *_: None
+
+@pytest.fixture(scope='module')
+def ranked():
+    records = prepare_records(parse_slots(make_page(3, 4, 0), [''], log=quiet), log=quiet)
+    return rank_schedules(build_subject_combinations(records), 1000)
+
+def write_spec(tmp_path, text, name='scoring.toml'):
+    path = tmp_path / name
+    path.write_text(text, encoding='utf-8')
+    return path
+
+def test_example_spec_loads():
+    spec = load_spec(Path(__file__).resolve().parent / 'scoring.example.toml')
+    assert spec['hard'] == ['latest_end']
+    assert spec['weights']['busy_day_off'] == 150
+
+def test_defaults_fill_in(tmp_path):
+    spec = load_spec(write_spec(tmp_path, 'days_off = ["fri"]\n[weights]\nbusy_day_off = 50\n'))
+    assert spec['weights']['gap_minutes'] == 1 and spec['weights']['busy_day_off'] == 50
+    assert spec['earliest_start'] is None and spec['hard'] == []
+
+@pytest.mark.parametrize('text, message', [
+    ('earliest = "09:00"\n', 'Unknown scoring keys'),
+    ('[weights]\ngaps = 1\n', 'Unknown scoring keys'),
+    ('[weights]\ngap_minutes = "1"\n', 'must be a number'),
+    ('[weights]\nlong_gap = true\n', 'must be a number'),
+    ('earliest_start = 9\n', 'must be a time'),
+    ('latest_end = "6pm"\n', 'must be a time'),
+    ('days_off = "FRI"\n', 'must be a list'),
+    ('days_off = ["FRIDAY"]\n', 'Unknown days_off'),
+    ('hard = ["teachers"]\n', 'can be hard'),
+])
+def test_invalid_spec(tmp_path, text, message):
+    with pytest.raises(ValueError, match=message):
+        load_spec(write_spec(tmp_path, text))
+
+def test_invalid_json(tmp_path):
+    with pytest.raises(ValueError, match='must be a table'):
+        load_spec(write_spec(tmp_path, json.dumps([1, 2]), 'scoring.json'))
+    with pytest.raises(ValueError):
+        load_spec(write_spec(tmp_path, '{"weights": ', 'scoring.json'))
+
+def scorer_for(tmp_path, text):
+    return Scorer(load_spec(write_spec(tmp_path, text)))
+
+def test_weighted_ordering(ranked, tmp_path):
+    # Early starts and Friday classes cost points on top of the default score
+    scorer = scorer_for(tmp_path, 'earliest_start = "10:00"\ndays_off = ["FRI"]\n'
+                                  '[weights]\nearly_minutes = 2\nbusy_day_off = 150\n')
+    table = ScheduleTable([ids for _, ids in ranked], scorer)
+    base = dict((ids, score) for score, ids in ranked)
+    friday = DAYS.index('FRI')
+
+    scores = [score for score, _ in table.schedules]
+    assert scores == sorted(scores)
+    for score, ids in table.schedules:
+        classes = get_slots(ids)
+        early = sum(max(600 - cls.start, 0) for cls in classes)
+        busy = any(cls.day_idx == friday for cls in classes)
+        assert score == base[ids] + 2 * early + 150 * busy
+    # Soft constraints only reorder
+    assert len(table.filter(*(False,) * 6)) == len(ranked)
+
+def test_hard_constraint_drops_rows(ranked, tmp_path):
+    soft = ScheduleTable([ids for _, ids in ranked], scorer_for(tmp_path, 'latest_end = "15:00"\n'))
+    hard = ScheduleTable([ids for _, ids in ranked], scorer_for(tmp_path, 'latest_end = "15:00"\nhard = ["latest_end"]\n'))
+
+    late = lambda ids: any(cls.end > 15 * 60 for cls in get_slots(ids))
+    kept = hard.filter(*(False,) * 6)[:]
+    assert 0 < len(kept) < len(ranked)
+    assert not any(late(ids) for _, ids in kept)
+    assert len(kept) == sum(not late(ids) for _, ids in ranked)
+    assert len(soft.filter(*(False,) * 6)) == len(ranked)
+
+    # The checkbox filters only ever narrow what the hard constraints left
+    assert set(hard.filter(False, True, False, False, False, False)[:]) <= set(kept)
+
+def test_rescore_back_to_default(ranked, tmp_path):
+    table = ScheduleTable([ids for _, ids in ranked], scorer_for(tmp_path, 'latest_end = "15:00"\nhard = ["latest_end"]\n'))
+    table.rescore()
+    assert table.schedules == ranked
+    assert len(table.filter(*(False,) * 6)) == len(ranked)
@@ -0,0 +1,75 @@
+from slot_solver import build_subject_combinations, rank_schedules, rerank_schedules, has_overlap, score_schedule
+from slot_parser import parse_slots
+from slot_cache import prepare_records
+from class_slot import get_slots
+from benchmark import make_page
+from itertools import product
+import pytest
+
+quiet = lambda *_: None
+
+# Small synthetic pages, every schedule can still be tried one by one
+PAGES = [(3, 3, seed) for seed in range(4)] + [(4, 2, seed) for seed in range(4)] + [(5, 2, 7)]
+
+def page_records(n_subjects, n_groups, seed):
+    return prepare_records(parse_slots(make_page(n_subjects, n_groups, seed), [''], log=quiet), log=quiet)
+
+def brute_force(subject_combinations, k):
+    # Score of every clash-free pick of one triple per subject, best first
+    scores = []
+    for triples in product(*subject_combinations.values()):
+        classes = [cls for triple in triples for cls in triple if cls]
+        if not has_overlap(classes):
+            scores.append(score_schedule(classes))
+    return sorted(scores)[:k]
+
+def check_ranked(ranked, subject_combinations, k):
+    # Ties may keep different schedules, so only the scores are compared
+    assert [score for score, _ in ranked] == brute_force(subject_combinations, k)
+    for score, ids in ranked:
+        classes = get_slots(ids)
+        assert not has_overlap(classes)
+        assert score_schedule(classes) == score
+        assert {cls.subject for cls in classes} == set(subject_combinations)
+
+@pytest.mark.parametrize('page', PAGES)
+@pytest.mark.parametrize('k', [1, 10, 300])
+def test_rank_matches_brute_force(page, k):
+    subject_combinations = build_subject_combinations(page_records(*page))
+    check_ranked(rank_schedules(subject_combinations, k), subject_combinations, k)
+
+@pytest.mark.parametrize('page', PAGES)
+def test_rank_without_bound(page):
+    subject_combinations = build_subject_combinations(page_records(*page))
+    assert rank_schedules(subject_combinations, 10, bound=False) == rank_schedules(subject_combinations, 10)
+
+@pytest.mark.parametrize('page', PAGES)
+@pytest.mark.parametrize('k', [5, 300])
+def test_rerank_after_groups_open(page, k):
+    # Every third practical was full at the last refresh
+    records = page_records(*page)
+    closed = [cls for cls in records if not (cls['Class Type'] == 'Practical' and int(cls['Group Number'].split()[-1]) % 3 == 0)]
+    old = build_subject_combinations(closed)
+    new = build_subject_combinations(records)
+    check_ranked(rerank_schedules(rank_schedules(old, k), old, new, k), new, k)
+
+@pytest.mark.parametrize('page', PAGES)
+@pytest.mark.parametrize('k', [5, 300])
+def test_rerank_after_groups_fill(page, k):
+    records = page_records(*page)
+    filled = [cls for cls in records if not (cls['Class Type'] == 'Practical' and cls['Group Number'] == 'Group 1')]
+    old = build_subject_combinations(records)
+    new = build_subject_combinations(filled)
+    check_ranked(rerank_schedules(rank_schedules(old, k), old, new, k), new, k)
+
+def test_rerank_after_subject_added():
+    records = page_records(4, 2, 1)
+    first = records[0]['Subject']
+    old = build_subject_combinations([cls for cls in records if cls['Subject'] != first])
+    new = build_subject_combinations(records)
+    check_ranked(rerank_schedules(rank_schedules(old, 10), old, new, 10), new, 10)
+
+def test_rerank_without_ranking():
+    # Nothing ranked yet (the first ranking was cancelled), nothing to carry over
+    combinations = build_subject_combinations(page_records(3, 3, 0))
+    check_ranked(rerank_schedules([], combinations, combinations, 300), combinations, 300)
@@ -0,0 +1,106 @@
+from contextlib import contextmanager
+from pathlib import Path
+import threading
+import json
+import time
+
+# One line per span, every run (scrape, select, ...) appended as it finishes
+trace_path = Path(__file__).resolve().parent / 'scraped_files' / 'trace.jsonl'
+
+# The run being traced on this thread, spans outside a run are not recorded
+local = threading.local()
+
+class Tracer:
+    def __init__(self, name, log=print):
+        self.log = log
+        self.run_id = f'{name}-{time.strftime("%Y%m%d-%H%M%S")}'
+        self.started_at = time.time()
+        self.start = time.perf_counter_ns()
+        self.spans = []
+        self.stack = []
+
+    @contextmanager
+    def span(self, name, **fields):
+        # Yields the span's record so the caller can add fields (retries, group, ...)
+        record = {
+            'run': self.run_id, 'id': len(self.spans), 'parent': self.stack[-1]['id'] if self.stack else None,
+            'depth': len(self.stack), 'name': name, **fields,
+        }
+        self.spans.append(record)
+        self.stack.append(record)
+        start = time.perf_counter_ns()
+        try:
+            yield record
+        except BaseException as e:
+            record['error'] = str(e) or type(e).__name__
+            raise
+        finally:
+            record['start_ms'] = round((start - self.start) / 1e6, 3)
+            record['ms'] = round((time.perf_counter_ns() - start) / 1e6, 3)
+            self.stack.pop()
+
+    def save(self, path=trace_path):
+        path.parent.mkdir(exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            for record in self.spans:
+                f.write(json.dumps({'started_at': self.started_at, **record}) + '\n')
+
+    def report(self, slowest=3):
+        # Steps of the run in order (looking through wrappers like a scrape inside a refresh),
+        # then the slowest steps inside them
+        children = lambda parent: [s for s in self.spans if s['parent'] == parent['id']]
+        steps = children(self.spans[0])
+        while len(steps) == 1 and children(steps[0]):
+            steps = children(steps[0])
+        if not steps:
+            return
+
+        self.log('Steps: ' + ', '.join(f'{describe(s)} {s["ms"]:.0f}ms' for s in steps))
+        inner = sorted((s for s in self.spans if s['depth'] > steps[0]['depth']), key=lambda s: s['ms'], reverse=True)
+        if inner:
+            self.log('Slowest: ' + ', '.join(f'{describe(s)} {s["ms"]:.0f}ms' for s in inner[:slowest]))
+
+def describe(record):
+    # Name plus the fields that tell spans of the same name apart ("click (Group 3)", "enroll (retries=2)")
+    extra = [value if isinstance(value, str) else f'{key}={value}' for key, value in record.items()
+             if key not in ('started_at', 'run', 'id', 'parent', 'depth', 'name', 'start_ms', 'ms', 'error')]
+    if 'error' in record:
+        extra.append('failed')
+    return f'{record["name"]} ({", ".join(extra)})' if extra else record['name']
+
+@contextmanager
+def trace(name, log=print, path=trace_path, **fields):
+    # The outermost trace starts a run, nested ones (a scrape inside a GUI refresh) are just spans
+    tracer = getattr(local, 'tracer', None)
+    if tracer:
+        with tracer.span(name, **fields) as record:
+            yield record
+        return
+
+    tracer = local.tracer = Tracer(name, log)
+    try:
+        with tracer.span(name, **fields) as record:
+            yield record
+    finally:
+        local.tracer = None
+        tracer.save(path)
+        tracer.report()
+
+@contextmanager
+def span(name, **fields):
+    tracer = getattr(local, 'tracer', None)
+    if tracer is None:
+        yield {}
+        return
+    with tracer.span(name, **fields) as record:
+        yield record
+
+if __name__ == '__main__':
+    # Time per step of the last run
+    if not trace_path.exists():
+        print('No trace yet, scrape or select at least once')
+    else:
+        records = [json.loads(line) for line in trace_path.read_text(encoding='utf-8').splitlines() if line]
+        last = [r for r in records if r['run'] == records[-1]['run']]
+        for r in sorted(last, key=lambda r: r['start_ms']):
+            print(f'{r["start_ms"]:10.1f}ms {r["ms"]:10.1f}ms  {"  " * r["depth"]}{describe(r)}')
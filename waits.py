@@ -0,0 +1,28 @@
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Poll every 50ms instead of WebDriverWait's default 500ms
+POLL_FREQUENCY = 0.05
+
+# Open every collapsed panel at once, same as clicking each chevron minus the animation
+EXPAND_SCRIPT = '''
+const panels = document.querySelectorAll('.mySubject .panel-collapse');
+for (const panel of panels) {
+    panel.classList.add('in');
+    panel.style.height = '';
+}
+return panels.length;
+'''
+
+# Number of panels that are still not rendered
+HIDDEN_SCRIPT = '''
+return Array.from(document.querySelectorAll('.mySubject .panel-collapse'))
+    .filter(panel => panel.offsetParent === null).length;
+'''
+
+def make_wait(driver, timeout=2):
+    return WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY)
+
+def expand_all(driver, timeout=2):
+    count = driver.execute_script(EXPAND_SCRIPT)
+    make_wait(driver, timeout).until(lambda d: d.execute_script(HIDDEN_SCRIPT) == 0)
+    return count
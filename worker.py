@@ -0,0 +1,64 @@
+import threading
+import queue
+
+class Cancelled(Exception):
+    pass
+
+class Worker:
+    # Runs one task at a time off the Tk main thread. The task talks back only
+    # through the queue, which is drained on the main thread with after().
+    def __init__(self, master, poll_ms=50):
+        self.master = master
+        self.poll_ms = poll_ms
+        self.messages = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.thread = None
+
+    def busy(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def run(self, task, on_log, on_done, on_error):
+        if self.busy():
+            return False
+
+        self.cancel_event.clear()
+        self.callbacks = {'log': on_log, 'done': on_done, 'error': on_error}
+
+        def target():
+            try:
+                self.messages.put(('done', task(self)))
+            except Exception as e:
+                self.messages.put(('error', e))
+
+        self.thread = threading.Thread(target=target, daemon=True)
+        self.thread.start()
+        self.master.after(self.poll_ms, self.poll)
+        return True
+
+    def poll(self):
+        while True:
+            try:
+                kind, payload = self.messages.get_nowait()
+            except queue.Empty:
+                break
+
+            self.callbacks[kind](payload)
+            if kind != 'log':
+                return
+
+        self.master.after(self.poll_ms, self.poll)
+
+    # Called from the task thread
+    def log(self, msg):
+        self.messages.put(('log', msg))
+
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise Cancelled('Cancelled')
+
+    # Called from the main thread
+    def cancel(self):
+        self.cancel_event.set()